@@ -0,0 +1,94 @@
+"""Benchmarks the memory used to hold many parsed SERPs.
+
+Run with ``python benchmarks/batch_memory.py``. Synthetic responses repeating a
+small set of domains and locations are parsed one at a time with
+:func:`~valueserp.serp.parse_web_serp`, with and without compaction, and as a
+batch with :func:`~valueserp.serp.parse_batch`, and the memory held by the
+results is compared. The benchmark fails if batching does not save memory
+over compacting each SERP separately.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tracemalloc
+from collections.abc import Callable
+
+from valueserp.serp import WebSERP, parse_batch, parse_web_serp
+
+DOMAINS = [f"www.example{i}.com" for i in range(50)]
+LOCATIONS = ["United Kingdom", "London,England,United Kingdom", "United States"]
+
+
+def make_bodies(count: int) -> list[str]:
+    """Builds synthetic search response bodies."""
+    bodies = []
+    for i in range(count):
+        results = []
+        for position in range(1, 11):
+            domain = DOMAINS[(i + position) % len(DOMAINS)]
+            results.append(
+                {
+                    "position": position,
+                    "title": f"Result {position} for keyword {i}",
+                    "link": f"https://{domain}/page/{i}/{position}",
+                    "domain": domain,
+                    "displayed_link": f"https://{domain}",
+                    "snippet": f"A description of result {position}.",
+                }
+            )
+        bodies.append(
+            json.dumps(
+                {
+                    "search_parameters": {
+                        "q": f"keyword {i}",
+                        "location": LOCATIONS[i % len(LOCATIONS)],
+                        "gl": "uk",
+                        "hl": "en",
+                    },
+                    "organic_results": results,
+                }
+            )
+        )
+    return bodies
+
+
+def measure(parse: Callable[[list[str]], list[WebSERP]], bodies: list[str]) -> int:
+    """Measures the bytes held by the SERPs parsed from the bodies."""
+    tracemalloc.start()
+    serps = parse(bodies)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del serps
+    return held
+
+
+def main() -> None:
+    """Runs the benchmark and prints a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--serps", type=int, default=5000)
+    args = parser.parse_args()
+
+    bodies = make_bodies(args.serps)
+    results = {
+        "parse_web_serp": measure(
+            lambda bodies: [parse_web_serp(b) for b in bodies], bodies
+        ),
+        "compacted": measure(
+            lambda bodies: [parse_web_serp(b, compact=True) for b in bodies], bodies
+        ),
+        "parse_batch": measure(parse_batch, bodies),
+    }
+    for name, held in results.items():
+        print(f"{name:<16} {held / 2**20:8.1f} MiB")
+
+    saved = 1 - results["parse_batch"] / results["compacted"]
+    print(f"parse_batch saves {saved:.0%} over compacting each SERP")
+    if saved <= 0:
+        sys.exit("parse_batch does not save memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmarks the time taken to import the package in a fresh interpreter.
+
+Run with ``python benchmarks/import_time.py``. Each sample starts a new Python
+process, so the numbers reflect the cold-start cost paid by short-lived CLI and
+serverless invocations.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+STATEMENTS = {
+    "import valueserp": "import valueserp",
+    "valueserp.Credentials": "import valueserp; valueserp.Credentials",
+    "valueserp.GoogleClient": "import valueserp; valueserp.GoogleClient",
+    "valueserp.AsyncGoogleClient": "import valueserp; valueserp.AsyncGoogleClient",
+}
+
+
+def measure(statement: str, runs: int) -> list[float]:
+    """Measures the wall time of running a statement in fresh interpreters.
+
+    The time taken to start an empty interpreter is subtracted from each
+    sample.
+
+    Args:
+        statement: The Python statement to run.
+        runs: The number of samples to take.
+
+    Returns:
+        The import time of each sample in milliseconds.
+    """
+    samples = []
+    for _ in range(runs):
+        baseline = _time_process("pass")
+        samples.append((_time_process(statement) - baseline) * 1000)
+    return samples
+
+
+def _time_process(statement: str) -> float:
+    """Times a fresh interpreter running a statement."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", statement], check=True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Runs the benchmark and prints a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    for name, statement in STATEMENTS.items():
+        samples = measure(statement, args.runs)
+        print(
+            f"{name:<30} median {statistics.median(samples):7.1f} ms"
+            f"  min {min(samples):7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
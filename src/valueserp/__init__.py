@@ -1,8 +1,53 @@
-"""A Python client library for fetching data from the VALUE SERP API."""
+"""A Python client library for fetching data from the VALUE SERP API.
+
+The clients, models and other public objects are imported on first access,
+so importing the package does not pay for HTTP libraries that a short-lived
+process may never use.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
 
 from valueserp import exceptions
-from valueserp.aclient import AsyncGoogleClient
-from valueserp.client import GoogleClient
-from valueserp.credentials import Credentials
-from valueserp.models import *
-from valueserp.serp import WebSERP
+
+if TYPE_CHECKING:
+    from valueserp.aclient import AsyncGoogleClient
+    from valueserp.client import GoogleClient
+    from valueserp.credentials import Credentials
+    from valueserp.locations import LocationIndex
+    from valueserp.models import *
+    from valueserp.serp import WebSERP
+
+_LAZY_ATTRIBUTES = {
+    "AsyncGoogleClient": "valueserp.aclient",
+    "GoogleClient": "valueserp.client",
+    "Credentials": "valueserp.credentials",
+    "LocationIndex": "valueserp.locations",
+    "SERPInfo": "valueserp.models",
+    "OrganicLink": "valueserp.models",
+    "FeaturedSnippet": "valueserp.models",
+    "PAAItem": "valueserp.models",
+    "Location": "valueserp.models",
+    "WebSERP": "valueserp.serp",
+}
+
+__all__ = ["exceptions", *_LAZY_ATTRIBUTES]
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    """Imports public objects on first access."""
+    try:
+        module_name = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")  # noqa: TRY003
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """Lists the module attributes, including those not imported yet."""
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,7 @@
+"""Allows the command-line interface to be run with ``python -m valueserp``."""
+
+import sys
+
+from valueserp.cli import main
+
+sys.exit(main())
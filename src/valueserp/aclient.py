@@ -7,29 +7,47 @@ from __future__ import annotations
 
 __all__ = ["AsyncGoogleClient", "SearchType"]
 
+import asyncio
+import contextlib
+import functools
 import json
-from collections.abc import Mapping
+import time
+from collections.abc import Awaitable, Callable, Mapping
 from types import TracebackType
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, TypeVar
 
 import httpx
 from typing_extensions import Self
 
 from valueserp import const, exceptions, utils
-from valueserp.const import DEFAULT_RETRIES, DEFAULT_TIMEOUT
+from valueserp.core import ClientCore, Request, adrive
 from valueserp.credentials import Credentials
+from valueserp.models import Location
+from valueserp.scheduler import Priority
 from valueserp.searchtype import SearchType
-from valueserp.serp import WebSERP
+from valueserp.serp import WebSERP, parse_web_serp
 
 if TYPE_CHECKING:
     import valueserp
 
+T = TypeVar("T")
 
-class AsyncGoogleClient:
+
+class AsyncGoogleClient(ClientCore):
     """The primary async interface for interacting with Google via VALUE SERP.
 
+    The attributes and I/O-free logic are shared with
+    :class:`~valueserp.GoogleClient` through
+    :class:`~valueserp.core.ClientCore`; this class only performs the I/O.
+
     Attributes:
-        credentials: An initialized :class:`valueserp.Credentials` object.
+        scheduler: An optional :class:`~valueserp.scheduler.PriorityScheduler`
+            that admits requests by priority.
+        hedge: An optional :class:`~valueserp.hedging.HedgePolicy` for sending
+            hedged requests to cut tail latency.
+        parse_executor: An optional :class:`concurrent.futures.Executor` in
+            which responses are decoded and parsed, keeping CPU-bound work off
+            the event loop. A process pool lets parsing use several cores.
     """
 
     def __init__(self, credentials: Credentials, **kwargs) -> None:
@@ -37,36 +55,52 @@ class AsyncGoogleClient:
 
         Args:
             credentials: An initialized :class:`valueserp.Credentials` object.
-            **kwargs: Additional keyword arguments to pass to the HTTP client.
+            **kwargs: Additional keyword arguments to pass to the HTTP client,
+                such as ``timeout``, ``retries``, ``accept_encoding``,
+                ``max_keepalive_connections`` or ``keepalive_expiry``, and
+                values for the optional attributes above and those of
+                :class:`~valueserp.core.ClientCore`.
         """
-        self.credentials = credentials
-        transport = httpx.AsyncHTTPTransport(
-            retries=kwargs.get("retries", DEFAULT_RETRIES)
-        )
+        super().__init__(credentials, **kwargs)
+        self.scheduler = kwargs.get("scheduler")
+        self.parse_executor = kwargs.get("parse_executor")
+        self.hedge = kwargs.get("hedge")
+        self._keepalive_task: asyncio.Task | None = None
         self._session = httpx.AsyncClient(
-            base_url=const.ENDPOINT,
-            params={"api_key": self.credentials.api_key},
-            transport=transport,
-            timeout=kwargs.get("timeout", DEFAULT_TIMEOUT),
+            transport=httpx.AsyncHTTPTransport(**self._transport_options(kwargs)),
+            **self._session_options(kwargs),
         )
 
-    async def search(self, params: Mapping[str, Any]) -> Mapping[str, Any]:
+    async def search(
+        self,
+        params: Mapping[str, Any],
+        priority: Priority = Priority.INTERACTIVE,
+        timeout: float | None = None,
+    ) -> Mapping[str, Any]:
         """Conducts a generic search with the API and returns the response.
 
+        The parameters are normalized with
+        :func:`~valueserp.utils.canonicalize_params` before being sent, so
+        equivalent searches always produce the same request.
+
         Args:
             params: Parameters to send to the API with the request.
+            priority: The priority class of the request.
+            timeout: The number of seconds after which to abandon the request.
 
         Returns:
             The API response as a dict parsed from JSON.
         """
-        response = await self._request(const.API_PATH["search"], params=params)
-        return json.loads(response)
+        response = await self._search_body(params, priority, timeout)
+        return await self._parse(json.loads, response)
 
     async def web_search(
         self,
         query: str,
         location: str | valueserp.Location | None = None,
         site: str | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+        timeout: float | None = None,
         **kwargs,
     ) -> WebSERP:
         """Makes a web search.
@@ -78,6 +112,8 @@ class AsyncGoogleClient:
             query: The query to search in Google.
             location: The location to use for the search in Google.
             site: Add a domain to use a site: search
+            priority: The priority class of the request.
+            timeout: The number of seconds after which to abandon the request.
             **kwargs: Custom parameters to pass to the API.
 
         Returns:
@@ -86,19 +122,85 @@ class AsyncGoogleClient:
 
         .. _custom parameters: https://www.valueserp.com/docs/search-api/searches/google/search#googleSearchParameters
         """
-        if site:
-            query = f"site:{site} {query}"
+        search_params = self._web_search_params(query, location, site, kwargs)
+        if self.parse_executor is None:
+            response = await self.search(
+                params=search_params, priority=priority, timeout=timeout
+            )
+            return self._web_serp(response)
+
+        # Decode and extract in one trip to the executor, compacting there if
+        # asked so that less is sent back.
+        response = await self._search_body(search_params, priority, timeout)
+        parser = functools.partial(parse_web_serp, compact=self.compact_serps)
+        return await self._parse(parser, response)
+
+    async def _search_body(
+        self, params: Mapping[str, Any], priority: Priority, timeout: float | None
+    ) -> str:
+        """Makes a search request and returns the undecoded response body."""
+        return await self._request(
+            const.API_PATH["search"],
+            params=utils.canonicalize_params(params),
+            priority=priority,
+            timeout=timeout,
+        )
+
+    async def _parse(self, parser: Callable[[str], T], body: str) -> T:
+        """Parses a response body, in the ``parse_executor`` if there is one."""
+        if self.parse_executor is None:
+            return parser(body)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.parse_executor, parser, body)
+
+    async def locations(
+        self,
+        query: str,
+        type: str | None = None,
+        country_code: str | None = None,
+    ) -> list[Location]:
+        """Searches the locations supported by the API.
+
+        If the client has a ``location_index``, fresh cached results are
+        returned without making a request, and new results are added to it.
+
+        Args:
+            query: The location name to search for.
+            type: Limit results to a type of location, such as 'city'.
+            country_code: Limit results to a two-letter country code.
+
+        Returns:
+            A list of :class:`~valueserp.models.Location` objects matching the
+            query, most relevant first.
+        """
+        cached = self._cached_locations(query, type, country_code)
+        if cached is not None:
+            return cached
+
+        params = self._locations_params(query, type, country_code)
+        response = await self._request(const.API_PATH["locations"], params=params)
+        return self._parse_locations(response, query, type, country_code)
 
-        search_params = {
-            "q": query,
-            "location": location,
-        }
-        # We don't want to override anything essential.
-        kwargs = {k: v for k, v in kwargs.items() if k not in search_params}
-        search_params.update(kwargs)
-        response = await self.search(params=search_params)
+    async def resolve_location(self, text: str) -> Location | None:
+        """Resolves free text to a single location.
 
-        return WebSERP(response)
+        The client's ``location_index`` is consulted first, and the locations
+        API is only queried if the index has no fresh match. Stale locations
+        are refreshed in the index from the API's response.
+
+        Args:
+            text: The free-text location to resolve.
+
+        Returns:
+            The best matching :class:`~valueserp.models.Location`, or None if
+            no location matches.
+        """
+        indexed = self._indexed_location(text)
+        if indexed is not None:
+            return indexed
+
+        locations = await self.locations(text)
+        return locations[0] if locations else None
 
     async def _request(
         self,
@@ -107,9 +209,21 @@ class AsyncGoogleClient:
         params: Mapping[str, Any] | None = None,
         headers: Mapping[str, str] | None = None,
         data: Mapping[str, Any] | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+        timeout: float | None = None,
     ) -> str:
         """Makes a request to the VALUE SERP API.
 
+        The request passes through the client's ``middleware``. If the client
+        has a ``scheduler``, each attempt then waits for capacity in its
+        priority class. If the client has a ``hedge`` policy, a second GET
+        request is sent when the first is unusually slow. Each request sent is
+        guarded by the ``circuit_breaker``, so time spent queued does not
+        count towards slow calls.
+
+        The response body is streamed rather than buffered by the HTTP client,
+        so oversized responses are rejected as soon as the limit is exceeded.
+
         Args:
             path: The API path to request. This must start with a '/' character.
             request_type:
@@ -117,31 +231,194 @@ class AsyncGoogleClient:
             params: Parameters to attach to the request as query strings.
             headers: Headers to provide with the request.
             data: JSON data to send along with the request.
+            priority: The priority class of the request.
+            timeout: The number of seconds, including any time spent queued,
+                after which to abandon the request. The connection is released
+                as soon as the request is abandoned.
 
         Returns:
             The API response body.
 
         Raises:
             APIError: The API responded with an error.
+            CircuitOpenError: The circuit breaker is open.
+            DecodingError: The response body could not be decompressed.
+            QueueFullError: The scheduler queue for the priority is full.
+            RequestTimeoutError: The request did not complete within
+                ``timeout`` seconds.
+            ResponseTooLargeError: The response body exceeded
+                ``max_response_size``.
+        """
+        request = Request(request_type, path, params, headers, data)
+        send = functools.partial(self._schedule, priority=priority)
+        flow = adrive(self._flow(request), send)
+        if timeout is None:
+            return await flow
+
+        try:
+            return await asyncio.wait_for(flow, timeout)
+        except asyncio.TimeoutError:
+            raise exceptions.RequestTimeoutError(timeout) from None
+
+    async def _schedule(self, request: Request, priority: Priority) -> str:
+        """Waits for scheduler capacity, if needed, and sends the request."""
+        if self.scheduler is None:
+            return await self._hedged_send(request, priority)
+
+        async with self.scheduler.slot(priority) as queue_time:
+            return await self._hedged_send(request, priority, queue_time=queue_time)
+
+    async def _hedged_send(
+        self, request: Request, priority: Priority, queue_time: float = 0.0
+    ) -> str:
+        """Sends a request, hedging it according to the ``hedge`` policy.
+
+        Only GET requests are hedged, as sending them twice is harmless. The
+        first successful response is returned and the other request is
+        cancelled. A request that fails before the hedging threshold is not
+        retried here.
+
+        A hedged request needs a scheduler slot of its own. If none is free
+        when the threshold passes, the request is not hedged rather than
+        exceed the scheduler's limits.
         """
+        send = functools.partial(self._send, request, queue_time)
+        threshold = self.hedge.threshold() if self.hedge is not None else None
+        if threshold is None or request.method != "GET":
+            start = time.perf_counter()
+            response = await send()
+            if self.hedge is not None:
+                self.hedge.latencies.record(time.perf_counter() - start)
+            return response
+
+        start = time.perf_counter()
+        pending = {asyncio.ensure_future(send())}
+        hedged = False
+        errors: list[BaseException] = []
         try:
-            res = await self._session.request(
-                request_type, path, params=params, headers=headers, json=data
-            )
-            res.raise_for_status()
-        except httpx.HTTPStatusError as e:
-            utils.parse_response_error(e)
-        except httpx.RequestError as e:
-            raise exceptions.RequestError() from e
-        else:
-            return res.text
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=None if hedged else threshold,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    hedged = True
+                    duplicate = self._start_hedge(send, priority)
+                    if duplicate is not None:
+                        self.hedge.hedges += 1
+                        pending.add(duplicate)
+                    continue
+                for task in done:
+                    if task.exception() is None:
+                        self.hedge.latencies.record(time.perf_counter() - start)
+                        return task.result()
+                    errors.append(task.exception())
+                hedged = True
+            raise errors[0]
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def _start_hedge(
+        self, send: Callable[[], Awaitable[str]], priority: Priority
+    ) -> asyncio.Future[str] | None:
+        """Starts a hedged request if the scheduler has a slot free for it."""
+        if self.scheduler is None:
+            return asyncio.ensure_future(send())
+        if not self.scheduler.try_acquire(priority):
+            return None
+        duplicate = asyncio.ensure_future(send())
+        duplicate.add_done_callback(lambda _: self.scheduler.release(priority))
+        return duplicate
+
+    async def _send(self, request: Request, queue_time: float = 0.0) -> str:
+        """Sends a request and reads the response body.
+
+        Args:
+            request: The request to send.
+            queue_time: The number of seconds the request spent queued, for
+                reporting in :class:`~valueserp.stats.ResponseStats`.
+
+        Returns:
+            The API response body.
+        """
+        start = time.perf_counter()
+        with self._guard(), self._translate_errors():
+            async with self._session.stream(
+                request.method,
+                request.path,
+                params=request.params,
+                headers=request.headers,
+                json=request.data,
+            ) as res:
+                if res.is_error:
+                    error_body = utils.error_body_reader(res)
+                    with contextlib.suppress(exceptions.VSError):
+                        error_body.check_headers(res.headers)
+                        async for chunk in res.aiter_raw():
+                            error_body.feed(chunk)
+                    self._raise_error(res, error_body)
+                body = self._body_reader(res)
+                async for chunk in res.aiter_raw():
+                    body.feed(chunk)
+        return self._finish(request, res, body, start, queue_time)
+
+    async def warm(self, connections: int = 1) -> int:
+        """Opens connections to the API ahead of the first requests.
+
+        Lightweight HEAD requests are sent concurrently, so each opens its own
+        pooled connection, paying for DNS resolution and the TLS handshake
+        before any search is made. Failures are ignored, as the searches
+        themselves will report any real problem.
+
+        Args:
+            connections: The number of connections to open.
+
+        Returns:
+            The number of connections successfully opened.
+        """
+        results = await asyncio.gather(*(self._ping() for _ in range(connections)))
+        return sum(results)
+
+    async def _ping(self) -> bool:
+        """Sends a HEAD request to open or refresh a pooled connection."""
+        if self._session.is_closed:
+            return False
+        try:
+            response = await self._session.send(self._ping_request(self._session))
+            await response.aclose()
+        except httpx.HTTPError:
+            return False
+        return True
+
+    async def _keepalive(self) -> None:
+        """Refreshes pooled connections until cancelled."""
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            await self.warm(max(self.warmup, 1))
 
     async def close(self) -> None:
         """Closes the HTTP session."""
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._keepalive_task
+            self._keepalive_task = None
         await self._session.aclose()
 
     async def __aenter__(self) -> Self:
-        """Enters the async context manager."""
+        """Enters the async context manager.
+
+        Opens ``warmup`` connections and, if a ``keepalive_interval`` is set,
+        starts refreshing pooled connections in a background task.
+        """
+        if self.warmup:
+            await self.warm(self.warmup)
+        if self.keepalive_interval is not None and self._keepalive_task is None:
+            self._keepalive_task = asyncio.create_task(self._keepalive())
         return self
 
     async def __aexit__(
@@ -0,0 +1,238 @@
+"""Provides a circuit breaker to fail fast while the API is unhealthy.
+
+When the API is degraded, every request may wait for the full timeout before
+failing. A :class:`CircuitBreaker` watches recent requests and, once too many
+of them fail or are too slow, "opens" so that further requests fail
+immediately with :class:`~valueserp.exceptions.CircuitOpenError`. After
+``reset_timeout`` seconds it lets a few probe requests through, closing again
+if they succeed.
+
+Passed as a client's ``circuit_breaker``, a breaker guards each request as it
+is sent, so it only measures time spent on the network. A breaker is also
+:class:`~valueserp.middleware.Middleware`, and can instead be placed in a
+client's ``middleware``, where it measures everything after it in the
+pipeline.
+"""
+
+from __future__ import annotations
+
+__all__ = ["CircuitBreaker", "CircuitState"]
+
+import collections
+import contextlib
+import enum
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import TYPE_CHECKING
+
+from valueserp import exceptions
+from valueserp.const import (
+    DEFAULT_BREAKER_FAILURE_RATE,
+    DEFAULT_BREAKER_MIN_CALLS,
+    DEFAULT_BREAKER_RESET_TIMEOUT,
+    DEFAULT_BREAKER_WINDOW,
+)
+
+if TYPE_CHECKING:
+    from valueserp.core import Flow, Request
+
+
+class CircuitState(enum.Enum):
+    """States of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stops sending requests while too many recent requests have failed.
+
+    A request counts as failed if it raises an exception that is
+    :attr:`~valueserp.exceptions.APIError.retryable`, such as a connection
+    failure, timeout or server error. Errors caused by the request itself,
+    like invalid parameters, show that the API is up and count as successes.
+    Successful requests slower than ``slow_call_duration`` count as slow, as
+    do requests abandoned after running that long, such as those cancelled by
+    a deadline. Requests abandoned sooner are not recorded.
+
+    The breaker is safe to share between threads and between clients.
+
+    Attributes:
+        failure_rate: The fraction of failed requests that opens the circuit.
+        slow_call_duration: The number of seconds after which a request is
+            slow, or None to ignore latency.
+        slow_call_rate: The fraction of slow requests that opens the circuit.
+        window: The number of most recent requests considered.
+        min_calls: The number of requests needed before the circuit can open.
+        reset_timeout: The number of seconds to stay open before probing.
+        half_open_calls: The number of probe requests allowed while half-open.
+            The circuit closes once they all succeed.
+        on_state_change: An optional callable that receives the old and new
+            :class:`CircuitState` whenever the state changes.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = DEFAULT_BREAKER_FAILURE_RATE,
+        slow_call_duration: float | None = None,
+        slow_call_rate: float = 1.0,
+        window: int = DEFAULT_BREAKER_WINDOW,
+        min_calls: int = DEFAULT_BREAKER_MIN_CALLS,
+        reset_timeout: float = DEFAULT_BREAKER_RESET_TIMEOUT,
+        half_open_calls: int = 1,
+        on_state_change: Callable[[CircuitState, CircuitState], None] | None = None,
+    ) -> None:
+        """Initializes the CircuitBreaker."""
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate = slow_call_rate
+        self.window = window
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.on_state_change = on_state_change
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        # Each outcome is a (failed, slow) pair.
+        self._outcomes: collections.deque[tuple[bool, bool]] = collections.deque(
+            maxlen=window
+        )
+
+    @property
+    def state(self) -> CircuitState:
+        """The current state of the circuit."""
+        with self._lock:
+            transition = self._check_reset()
+            state = self._state
+        self._notify(transition)
+        return state
+
+    @contextlib.contextmanager
+    def call(self) -> Iterator[None]:
+        """Guards a request, recording its outcome.
+
+        Raises:
+            CircuitOpenError: The circuit is open, so the request must not be
+                sent.
+        """
+        self._before_call()
+        start = time.monotonic()
+        try:
+            yield
+        except exceptions.APIError as e:
+            if e.retryable:
+                self._record(failed=True, slow=False)
+            else:
+                self._record(failed=False, slow=False)
+            raise
+        except BaseException:
+            # The request was abandoned, e.g. cancelled by a deadline. If it
+            # had already run for too long, the API is too slow to answer in
+            # time; otherwise this says nothing about the health of the API.
+            if self._is_slow(start):
+                self._record(failed=False, slow=True)
+            else:
+                self._release_probe()
+            raise
+        else:
+            self._record(failed=False, slow=self._is_slow(start))
+
+    def handle(self, request: Request, call_next: Callable[[Request], Flow]) -> Flow:
+        """Guards a request passing through the middleware pipeline."""
+        with self.call():
+            return (yield from call_next(request))
+
+    def reset(self) -> None:
+        """Closes the circuit and forgets all recorded requests."""
+        with self._lock:
+            transition = self._transition(CircuitState.CLOSED)
+        self._notify(transition)
+
+    def _before_call(self) -> None:
+        """Checks whether a request may be sent."""
+        with self._lock:
+            transition = self._check_reset()
+            allowed = self._state is CircuitState.CLOSED
+            if self._state is CircuitState.HALF_OPEN:
+                allowed = self._probes < self.half_open_calls
+                self._probes += allowed
+            retry_after = max(
+                self._opened_at + self.reset_timeout - time.monotonic(), 0.0
+            )
+        self._notify(transition)
+        if not allowed:
+            raise exceptions.CircuitOpenError(retry_after)
+
+    def _record(self, failed: bool, slow: bool) -> None:
+        """Records the outcome of a request and updates the state."""
+        with self._lock:
+            transition = None
+            if self._state is CircuitState.HALF_OPEN:
+                if failed or slow:
+                    transition = self._transition(CircuitState.OPEN)
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_calls:
+                        transition = self._transition(CircuitState.CLOSED)
+            elif self._state is CircuitState.CLOSED:
+                self._outcomes.append((failed, slow))
+                if self._should_open():
+                    transition = self._transition(CircuitState.OPEN)
+        self._notify(transition)
+
+    def _is_slow(self, start: float) -> bool:
+        """Checks whether a request started at ``start`` has been slow."""
+        return (
+            self.slow_call_duration is not None
+            and time.monotonic() - start > self.slow_call_duration
+        )
+
+    def _release_probe(self) -> None:
+        """Frees the probe slot of an abandoned half-open request."""
+        with self._lock:
+            if self._state is CircuitState.HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def _should_open(self) -> bool:
+        """Checks whether recent outcomes are bad enough to open the circuit."""
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return False
+        failures = sum(failed for failed, _ in self._outcomes)
+        slow = sum(slow for _, slow in self._outcomes)
+        return failures / calls >= self.failure_rate or (
+            self.slow_call_duration is not None and slow / calls >= self.slow_call_rate
+        )
+
+    def _check_reset(self) -> tuple[CircuitState, CircuitState] | None:
+        """Moves an open circuit to half-open once the reset timeout passes."""
+        if (
+            self._state is CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            return self._transition(CircuitState.HALF_OPEN)
+        return None
+
+    def _transition(
+        self, state: CircuitState
+    ) -> tuple[CircuitState, CircuitState] | None:
+        """Changes state, returning the transition if the state changed."""
+        old = self._state
+        self._state = state
+        self._probes = 0
+        self._probe_successes = 0
+        if state is CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        elif state is CircuitState.CLOSED:
+            self._outcomes.clear()
+        return (old, state) if old is not state else None
+
+    def _notify(self, transition: tuple[CircuitState, CircuitState] | None) -> None:
+        """Calls the state change hook outside the lock."""
+        if transition is not None and self.on_state_change is not None:
+            self.on_state_change(*transition)
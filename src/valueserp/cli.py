@@ -0,0 +1,392 @@
+"""Provides the ``valueserp`` command for running bulk web searches.
+
+Queries are read from a text file with one query per line, or from a CSV file
+with a ``query`` column. Other CSV columns, such as ``location`` or ``gl``, are
+sent as search parameters, except for ``priority`` and ``timeout``, which are
+options of the client rather than parameters and are ignored. Results are
+written as NDJSON (one raw API response per line) or as CSV (one row per
+organic result).
+
+Completed searches are recorded in a checkpoint file, so an interrupted run can
+be restarted with the same arguments and will skip the searches that already
+finished. Failed searches are reported on stderr rather than written to the
+output, and are run again when the run is restarted, so the output only ever
+holds one result for each search.
+
+Example:
+    valueserp keywords.csv -o results.ndjson --concurrency 20 --rate 10
+"""
+
+from __future__ import annotations
+
+__all__ = ["main"]
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from typing import IO, Any
+
+from valueserp import utils
+from valueserp.aclient import AsyncGoogleClient
+from valueserp.const import DEFAULT_MAX_CONCURRENCY
+from valueserp.credentials import Credentials
+from valueserp.middleware import RateLimitMiddleware
+from valueserp.scheduler import Priority
+from valueserp.serp import WebSERP
+
+API_KEY_ENV = "VALUESERP_API_KEY"
+
+# Columns that would clash with the client's own arguments to web_search.
+RESERVED_PARAMS = frozenset({"priority", "timeout"})
+
+CSV_FIELDS = [
+    "query",
+    "location",
+    "position",
+    "title",
+    "url",
+    "url_displayed",
+    "description",
+]
+
+
+class Job:
+    """A single search to run.
+
+    Attributes:
+        params: The search parameters, including the query as ``q``.
+        key: The stable key identifying the search.
+    """
+
+    def __init__(self, params: dict[str, Any]) -> None:
+        """Initializes the Job."""
+        self.params = params
+        self.key = utils.request_key(params)
+
+
+class Progress:
+    """Reports throughput and the estimated time remaining on stderr."""
+
+    def __init__(self, total: int, enabled: bool = True) -> None:
+        """Initializes the Progress reporter."""
+        self.total = total
+        self.done = 0
+        self.errors = 0
+        self.enabled = enabled
+        self._start = time.monotonic()
+        self._last_report = 0.0
+
+    def log(self, message: str) -> None:
+        """Writes a message to stderr on its own line, even if disabled."""
+        if self.enabled and self._last_report:
+            # Keep the progress line rather than write over it.
+            sys.stderr.write("\n")
+        sys.stderr.write(message + "\n")
+        sys.stderr.flush()
+
+    def update(self, error: bool = False) -> None:
+        """Records a finished search."""
+        self.done += 1
+        self.errors += error
+        now = time.monotonic()
+        if now - self._last_report >= 0.5 or self.done == self.total:
+            self._last_report = now
+            self.report()
+
+    def report(self, end: str = "") -> None:
+        """Writes the current progress to stderr."""
+        if not self.enabled:
+            return
+        elapsed = time.monotonic() - self._start
+        rate = self.done / elapsed if elapsed else 0.0
+        remaining = (self.total - self.done) / rate if rate else float("inf")
+        eta = time.strftime("%H:%M:%S", time.gmtime(remaining)) if rate else "--:--:--"
+        sys.stderr.write(
+            f"\r{self.done}/{self.total} searches, {self.errors} errors,"
+            f" {rate:.1f}/s, ETA {eta}{end}"
+        )
+        sys.stderr.flush()
+
+
+class NDJSONWriter:
+    """Writes each result as a line of JSON."""
+
+    def __init__(self, file: IO[str]) -> None:
+        """Initializes the NDJSONWriter."""
+        self._file = file
+
+    def write(self, job: Job, serp: WebSERP) -> None:
+        """Writes the result of a job."""
+        record = {"key": job.key, "params": job.params, "response": serp.raw}
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+
+class CSVWriter:
+    """Writes each organic result as a row of CSV."""
+
+    def __init__(self, file: IO[str], write_header: bool = True) -> None:
+        """Initializes the CSVWriter."""
+        self._file = file
+        self._writer = csv.DictWriter(file, CSV_FIELDS, extrasaction="ignore")
+        if write_header:
+            self._writer.writeheader()
+
+    def write(self, job: Job, serp: WebSERP) -> None:
+        """Writes the result of a job."""
+        base = {"query": job.params["q"], "location": job.params.get("location")}
+        for link in serp.links:
+            self._writer.writerow(
+                {
+                    **base,
+                    "position": link.position,
+                    "title": link.title,
+                    "url": link.url,
+                    "url_displayed": link.url_displayed,
+                    "description": link.description,
+                }
+            )
+        self._file.flush()
+
+
+def read_jobs(
+    file: IO[str], input_format: str, defaults: dict[str, Any]
+) -> Iterator[Job]:
+    """Reads searches from an input file.
+
+    Args:
+        file: The file to read from.
+        input_format: Either 'csv' or 'txt'.
+        defaults: Parameters to use for every search unless the input
+            overrides them.
+
+    Columns and parameters named in ``RESERVED_PARAMS`` are dropped.
+
+    Yields:
+        A job for each non-empty query, in input order.
+    """
+    if input_format == "csv":
+        rows: Iterable[dict[str, Any]] = csv.DictReader(file)
+    else:
+        rows = ({"query": line} for line in file)
+
+    for row in rows:
+        row = {k.strip().lower(): (v or None) for k, v in row.items() if k}
+        query = row.pop("query", None) or row.pop("q", None)
+        if not query or not query.strip():
+            continue
+        params = {**defaults, **{k: v for k, v in row.items() if v is not None}}
+        params = {k: v for k, v in params.items() if k not in RESERVED_PARAMS}
+        yield Job({**params, "q": query.strip()})
+
+
+def read_checkpoint(path: str | None) -> set[str]:
+    """Reads the keys of searches completed by a previous run."""
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as file:
+        return {line.strip() for line in file if line.strip()}
+
+
+async def run(
+    client: AsyncGoogleClient,
+    jobs: list[Job],
+    writer: NDJSONWriter | CSVWriter,
+    checkpoint: IO[str] | None,
+    concurrency: int,
+    progress: Progress,
+) -> None:
+    """Runs searches concurrently and writes their results.
+
+    Args:
+        client: The client to search with.
+        jobs: The searches to run.
+        writer: Where to write the results of successful searches.
+        checkpoint: A file in which to record the keys of completed searches.
+        concurrency: The maximum number of searches in flight.
+        progress: The progress reporter.
+    """
+    queue: asyncio.Queue[Job] = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+
+    async def worker() -> None:
+        while not queue.empty():
+            job = queue.get_nowait()
+            params = dict(job.params)
+            query = params.pop("q")
+            try:
+                serp = await client.web_search(query, priority=Priority.BULK, **params)
+            except Exception as e:
+                # A failed search, even from a bad row, must not stop the rest.
+                progress.log(f"{query!r} failed: {type(e).__name__}: {e}")
+                progress.update(error=True)
+                continue
+            writer.write(job, serp)
+            if checkpoint is not None:
+                checkpoint.write(job.key + "\n")
+                checkpoint.flush()
+            progress.update()
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parses command-line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="valueserp", description="Run bulk web searches with VALUE SERP."
+    )
+    parser.add_argument(
+        "input", help="a file of queries (.txt or .csv), or '-' for stdin"
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="where to write results (default: stdout)"
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=("ndjson", "csv"),
+        help="the output format (default: from the output extension, else ndjson)",
+    )
+    parser.add_argument(
+        "--input-format",
+        choices=("txt", "csv"),
+        help="the input format (default: from the input extension, else txt)",
+    )
+    parser.add_argument(
+        "--api-key",
+        default=os.environ.get(API_KEY_ENV),
+        help=f"the VALUE SERP API key (default: ${API_KEY_ENV})",
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help="the maximum number of searches in flight",
+    )
+    parser.add_argument(
+        "-r", "--rate", type=float, help="the maximum searches started per second"
+    )
+    parser.add_argument("-l", "--location", help="the default search location")
+    parser.add_argument(
+        "-p",
+        "--param",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="an extra search parameter; may be repeated",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="a file recording completed searches"
+        " (default: the output path with .checkpoint appended)",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="don't report progress"
+    )
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        parser.error(f"an API key is required; use --api-key or set ${API_KEY_ENV}")
+    for param in args.param:
+        if "=" not in param:
+            parser.error(f"invalid --param {param!r}; expected NAME=VALUE")
+    if args.format is None:
+        args.format = "csv" if args.output.lower().endswith(".csv") else "ndjson"
+    if args.input_format is None:
+        args.input_format = "csv" if args.input.lower().endswith(".csv") else "txt"
+    if args.checkpoint is None and args.output != "-":
+        args.checkpoint = args.output + ".checkpoint"
+    return args
+
+
+def _pending_jobs(args: argparse.Namespace, completed: set[str]) -> list[Job]:
+    """Reads the input and returns the searches that still need running."""
+    defaults = dict(param.split("=", 1) for param in args.param)
+    if args.location:
+        defaults["location"] = args.location
+
+    if args.input == "-":
+        jobs = list(read_jobs(sys.stdin, args.input_format, defaults))
+    else:
+        with open(args.input, encoding="utf-8", newline="") as file:
+            jobs = list(read_jobs(file, args.input_format, defaults))
+
+    seen = set(completed)
+    pending = []
+    for job in jobs:
+        # Duplicate queries only need to be searched once.
+        if job.key not in seen:
+            seen.add(job.key)
+            pending.append(job)
+    return pending
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Runs the command-line interface.
+
+    Args:
+        argv: The command-line arguments, excluding the program name.
+
+    Returns:
+        The exit status: 0 if every search succeeded, 1 otherwise.
+    """
+    args = parse_args(argv)
+    completed = read_checkpoint(args.checkpoint)
+    pending = _pending_jobs(args, completed)
+
+    resuming = bool(completed)
+    if args.output == "-":
+        output = sys.stdout
+    else:
+        output = open(
+            args.output, "a" if resuming else "w", encoding="utf-8", newline=""
+        )
+    checkpoint = (
+        open(args.checkpoint, "a", encoding="utf-8") if args.checkpoint else None
+    )
+    if args.format == "csv":
+        has_header = resuming and output is not sys.stdout and output.tell() > 0
+        writer = CSVWriter(output, write_header=not has_header)
+    else:
+        writer = NDJSONWriter(output)
+
+    progress = Progress(len(pending), enabled=not args.quiet)
+    middleware = [RateLimitMiddleware(args.rate)] if args.rate else []
+    client = AsyncGoogleClient(Credentials(args.api_key), middleware=middleware)
+
+    async def _main() -> None:
+        async with client:
+            await run(
+                client,
+                pending,
+                writer,
+                checkpoint,
+                args.concurrency,
+                progress,
+            )
+
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        progress.report(end="\n")
+        sys.stderr.write("Interrupted; run again to resume.\n")
+        return 130
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if checkpoint is not None:
+            checkpoint.close()
+
+    progress.report(end="\n")
+    return 1 if progress.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
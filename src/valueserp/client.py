@@ -7,7 +7,11 @@ from __future__ import annotations
 
 __all__ = ["GoogleClient"]
 
+import concurrent.futures
+import contextlib
 import json
+import threading
+import time
 from collections.abc import Mapping
 from types import TracebackType
 from typing import Any
@@ -17,16 +21,18 @@ from typing_extensions import Self
 
 import valueserp.exceptions
 from valueserp import const, exceptions, utils
-from valueserp.const import DEFAULT_RETRIES, DEFAULT_TIMEOUT
+from valueserp.core import ClientCore, Request, drive
 from valueserp.credentials import Credentials
+from valueserp.models import Location
 from valueserp.serp import WebSERP
 
 
-class GoogleClient:
+class GoogleClient(ClientCore):
     """The primary interface for interacting with Google via VALUE SERP.
 
-    Attributes:
-        credentials: An initialized :class:`valueserp.Credentials` object.
+    The attributes and I/O-free logic are shared with
+    :class:`~valueserp.AsyncGoogleClient` through
+    :class:`~valueserp.core.ClientCore`; this class only performs the I/O.
     """
 
     def __init__(self, credentials: Credentials, **kwargs) -> None:
@@ -34,27 +40,36 @@ class GoogleClient:
 
         Args:
             credentials: An initialized :class:`valueserp.Credentials` object.
-            **kwargs: Additional keyword arguments to pass to the HTTP client.
+            **kwargs: Additional keyword arguments to pass to the HTTP client,
+                such as ``timeout``, ``retries``, ``accept_encoding``,
+                ``max_keepalive_connections`` or ``keepalive_expiry``, and
+                values for the optional attributes of
+                :class:`~valueserp.core.ClientCore`.
         """
-        self.credentials = credentials
-        transport = httpx.HTTPTransport(retries=kwargs.get("retries", DEFAULT_RETRIES))
+        super().__init__(credentials, **kwargs)
+        self._keepalive_stop: threading.Event | None = None
+        self._keepalive_thread: threading.Thread | None = None
         self._session = httpx.Client(
-            base_url=const.ENDPOINT,
-            params={"api_key": self.credentials.api_key},
-            transport=transport,
-            timeout=kwargs.get("timeout", DEFAULT_TIMEOUT),
+            transport=httpx.HTTPTransport(**self._transport_options(kwargs)),
+            **self._session_options(kwargs),
         )
 
     def search(self, params: Mapping[str, Any]) -> Mapping[str, Any]:
         """Conducts a generic search with the API and returns the response.
 
+        The parameters are normalized with
+        :func:`~valueserp.utils.canonicalize_params` before being sent, so
+        equivalent searches always produce the same request.
+
         Args:
             params: Parameters to send to the API with the request.
 
         Returns:
             The API response as a dict parsed from JSON.
         """
-        response = self._request(const.API_PATH["search"], params=params)
+        response = self._request(
+            const.API_PATH["search"], params=utils.canonicalize_params(params)
+        )
         return json.loads(response)
 
     def web_search(
@@ -81,19 +96,59 @@ class GoogleClient:
 
         .. _custom parameters: https://www.valueserp.com/docs/search-api/searches/google/search#googleSearchParameters
         """
-        if site:
-            query = f"site:{site} {query}"
-
-        search_params = {
-            "q": query,
-            "location": location,
-        }
-        # We don't want to override anything essential.
-        kwargs = {k: v for k, v in kwargs.items() if k not in search_params}
-        search_params.update(kwargs)
+        search_params = self._web_search_params(query, location, site, kwargs)
         response = self.search(params=search_params)
 
-        return WebSERP(response)
+        return self._web_serp(response)
+
+    def locations(
+        self,
+        query: str,
+        type: str | None = None,
+        country_code: str | None = None,
+    ) -> list[Location]:
+        """Searches the locations supported by the API.
+
+        If the client has a ``location_index``, fresh cached results are
+        returned without making a request, and new results are added to it.
+
+        Args:
+            query: The location name to search for.
+            type: Limit results to a type of location, such as 'city'.
+            country_code: Limit results to a two-letter country code.
+
+        Returns:
+            A list of :class:`~valueserp.models.Location` objects matching the
+            query, most relevant first.
+        """
+        cached = self._cached_locations(query, type, country_code)
+        if cached is not None:
+            return cached
+
+        params = self._locations_params(query, type, country_code)
+        response = self._request(const.API_PATH["locations"], params=params)
+        return self._parse_locations(response, query, type, country_code)
+
+    def resolve_location(self, text: str) -> Location | None:
+        """Resolves free text to a single location.
+
+        The client's ``location_index`` is consulted first, and the locations
+        API is only queried if the index has no fresh match. Stale locations
+        are refreshed in the index from the API's response.
+
+        Args:
+            text: The free-text location to resolve.
+
+        Returns:
+            The best matching :class:`~valueserp.models.Location`, or None if
+            no location matches.
+        """
+        indexed = self._indexed_location(text)
+        if indexed is not None:
+            return indexed
+
+        locations = self.locations(text)
+        return locations[0] if locations else None
 
     def _request(
         self,
@@ -105,6 +160,11 @@ class GoogleClient:
     ) -> str:
         """Makes a request to the VALUE SERP API.
 
+        The request passes through the client's ``middleware``, and each
+        attempt to send it is guarded by the ``circuit_breaker``. The response
+        body is streamed rather than buffered by the HTTP client, so
+        oversized responses are rejected as soon as the limit is exceeded.
+
         Args:
             path: The API path to request. This must start with a '/' character.
             request_type:
@@ -117,26 +177,99 @@ class GoogleClient:
             The API response body.
 
         Raises:
+            CircuitOpenError: The circuit breaker is open.
             RequestError: There was a problem making the request to the API.
+            DecodingError: The response body could not be decompressed.
+            ResponseTooLargeError: The response body exceeded
+                ``max_response_size``.
+        """
+        request = Request(request_type, path, params, headers, data)
+        return drive(self._flow(request), self._send)
+
+    def _send(self, request: Request) -> str:
+        """Sends a request and reads the response body."""
+        start = time.perf_counter()
+        with self._guard(), self._translate_errors():
+            with self._session.stream(
+                request.method,
+                request.path,
+                params=request.params,
+                headers=request.headers,
+                json=request.data,
+            ) as res:
+                if res.is_error:
+                    error_body = utils.error_body_reader(res)
+                    with contextlib.suppress(exceptions.VSError):
+                        error_body.check_headers(res.headers)
+                        for chunk in res.iter_raw():
+                            error_body.feed(chunk)
+                    self._raise_error(res, error_body)
+                body = self._body_reader(res)
+                for chunk in res.iter_raw():
+                    body.feed(chunk)
+        return self._finish(request, res, body, start)
+
+    def warm(self, connections: int = 1) -> int:
+        """Opens connections to the API ahead of the first requests.
+
+        Lightweight HEAD requests are sent concurrently, so each opens its own
+        pooled connection, paying for DNS resolution and the TLS handshake
+        before any search is made. Failures are ignored, as the searches
+        themselves will report any real problem.
+
+        Args:
+            connections: The number of connections to open.
+
+        Returns:
+            The number of connections successfully opened.
         """
+        if connections <= 1:
+            return int(connections == 1 and self._ping())
+        with concurrent.futures.ThreadPoolExecutor(connections) as executor:
+            futures = [executor.submit(self._ping) for _ in range(connections)]
+        return sum(future.result() for future in futures)
+
+    def _ping(self) -> bool:
+        """Sends a HEAD request to open or refresh a pooled connection."""
+        if self._session.is_closed:
+            return False
         try:
-            res = self._session.request(
-                request_type, path, params=params, headers=headers, json=data
-            )
-            res.raise_for_status()
-        except httpx.HTTPStatusError as e:
-            utils.parse_response_error(e)
-        except httpx.RequestError as e:
-            raise exceptions.RequestError() from e
-        else:
-            return res.text
+            self._session.send(self._ping_request(self._session)).close()
+        except httpx.HTTPError:
+            return False
+        return True
+
+    def _keepalive(self, stop: threading.Event) -> None:
+        """Refreshes pooled connections until ``stop`` is set."""
+        while not stop.wait(self.keepalive_interval):
+            self.warm(max(self.warmup, 1))
 
     def close(self) -> None:
-        """Closes the HTTP session."""
+        """Closes the HTTP session.
+
+        Any background keepalive is stopped first, waiting for a refresh in
+        progress to finish so it never uses the closed session.
+        """
+        if self._keepalive_stop is not None:
+            self._keepalive_stop.set()
+            self._keepalive_thread.join()
+            self._keepalive_stop = self._keepalive_thread = None
         self._session.close()
 
     def __enter__(self) -> Self:
-        """Enters the async context manager."""
+        """Enters the context manager.
+
+        Opens ``warmup`` connections and, if a ``keepalive_interval`` is set,
+        starts refreshing pooled connections in a background thread.
+        """
+        if self.warmup:
+            self.warm(self.warmup)
+        if self.keepalive_interval is not None and self._keepalive_stop is None:
+            self._keepalive_stop = threading.Event()
+            self._keepalive_thread = threading.Thread(
+                target=self._keepalive, args=(self._keepalive_stop,), daemon=True
+            )
+            self._keepalive_thread.start()
         return self
 
     def __exit__(
@@ -145,5 +278,5 @@ class GoogleClient:
         exc_val: BaseException | None,
         exc_tb: TracebackType | None,
     ) -> None:
-        """Exits the async context manager."""
+        """Exits the context manager."""
         self.close()
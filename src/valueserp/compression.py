@@ -0,0 +1,276 @@
+"""Provides content-encoding negotiation and decompression of API responses.
+
+Gzip and deflate are always available. Brotli and Zstandard are used when the
+``brotli`` (or ``brotlicffi``) and ``zstandard`` packages are installed, for
+example with ``pip install valueserp[brotli,zstd]``.
+
+The clients read raw bytes from httpx and decompress them here, rather than
+using the decoders built into httpx, for two reasons. Each decompressor is
+given the number of bytes the body may still grow by, and stops soon after
+producing more, so a small compressed chunk can never expand to far beyond
+``max_response_size`` in memory. And decompression is timed on its own, for
+:attr:`~valueserp.stats.ResponseStats.decode_time`, which is not possible
+when httpx decodes chunks as it downloads them.
+"""
+
+from __future__ import annotations
+
+__all__ = ["accept_encoding", "get_decompressor", "supported_encodings"]
+
+import contextlib
+import zlib
+from collections.abc import Callable
+from typing import Protocol
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# Decoders that cannot limit their output are fed input in slices of this many
+# bytes, and stop once a slice takes the output over the limit.
+_SLICE_SIZE = 1024
+
+# The size of the blocks in which Zstandard data is decompressed.
+_ZSTD_WRITE_SIZE = 64 * 1024
+
+
+class Decompressor(Protocol):
+    """Incrementally decompresses a response body."""
+
+    def decompress(self, data: bytes, max_length: int = -1) -> bytes:
+        """Decompresses the next chunk of the body.
+
+        If ``max_length`` is not negative, decompression stops soon after more
+        than ``max_length`` bytes have been produced. The body is then too
+        large, and the rest of the chunk is discarded.
+        """
+
+    def flush(self) -> bytes:
+        """Returns any remaining decompressed data."""
+
+
+class IdentityDecompressor:
+    """Passes through data that is not compressed."""
+
+    def decompress(self, data: bytes, max_length: int = -1) -> bytes:
+        """Returns the chunk unchanged."""
+        return data
+
+    def flush(self) -> bytes:
+        """Returns no data."""
+        return b""
+
+
+class ZlibDecompressor:
+    """Decompresses gzip or deflate encoded data."""
+
+    def __init__(self, encoding: str) -> None:
+        """Initializes the ZlibDecompressor."""
+        wbits = zlib.MAX_WBITS | 16 if encoding == "gzip" else zlib.MAX_WBITS
+        self._obj = zlib.decompressobj(wbits)
+        self._first = encoding == "deflate"
+
+    def decompress(self, data: bytes, max_length: int = -1) -> bytes:
+        """Decompresses the next chunk of the body."""
+        # zlib treats a limit of 0 as no limit.
+        limit = max_length + 1 if max_length >= 0 else 0
+        if self._first and data:
+            self._first = False
+            # Some servers send raw deflate streams without the zlib header.
+            try:
+                return self._obj.decompress(data, limit)
+            except zlib.error:
+                self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self._obj.decompress(data, limit)
+
+    def flush(self) -> bytes:
+        """Returns any remaining decompressed data."""
+        return self._obj.flush()
+
+
+class BrotliDecompressor:
+    """Decompresses Brotli encoded data."""
+
+    def __init__(self) -> None:
+        """Initializes the BrotliDecompressor."""
+        self._obj = brotli.Decompressor()
+        # The brotli and brotlicffi packages name this method differently.
+        self._decompress = getattr(self._obj, "process", None) or self._obj.decompress
+        # Only newer versions can limit their output.
+        self._limited = hasattr(self._obj, "can_accept_more_data")
+
+    def decompress(self, data: bytes, max_length: int = -1) -> bytes:
+        """Decompresses the next chunk of the body."""
+        if max_length < 0:
+            return self._decompress(data)
+        if self._limited:
+            return self._decompress(data, output_buffer_limit=max_length + 1)
+        return _decompress_slices(self._decompress, data, max_length)
+
+    def flush(self) -> bytes:
+        """Returns any remaining decompressed data."""
+        return b""
+
+
+class ZstdDecompressor:
+    """Decompresses Zstandard encoded data."""
+
+    def __init__(self) -> None:
+        """Initializes the ZstdDecompressor."""
+        # Unlike its decompressobj, a stream writer hands over its output a
+        # block at a time, so decompression can be stopped part way through.
+        self._output = _LimitedOutput()
+        self._writer = zstandard.ZstdDecompressor().stream_writer(
+            self._output, write_size=_ZSTD_WRITE_SIZE
+        )
+
+    def decompress(self, data: bytes, max_length: int = -1) -> bytes:
+        """Decompresses the next chunk of the body."""
+        self._output.limit = max_length
+        with contextlib.suppress(_OutputLimitError):
+            self._writer.write(data)
+        return self._output.take()
+
+    def flush(self) -> bytes:
+        """Returns any remaining decompressed data."""
+        return b""
+
+
+class MultiDecompressor:
+    """Decompresses data to which several encodings were applied in turn."""
+
+    def __init__(self, decompressors: list[Decompressor]) -> None:
+        """Initializes the MultiDecompressor."""
+        self._decompressors = decompressors
+
+    def decompress(self, data: bytes, max_length: int = -1) -> bytes:
+        """Decompresses the next chunk of the body.
+
+        Every stage is limited, as each is compressed data that decompresses
+        to at least about its own size. A stage producing more than
+        ``max_length`` bytes is returned as it is, to show that the body is
+        too large.
+        """
+        for decompressor in self._decompressors:
+            data = decompressor.decompress(data, max_length)
+            if 0 <= max_length < len(data):
+                break
+        return data
+
+    def flush(self) -> bytes:
+        """Returns any remaining decompressed data."""
+        data = b""
+        for decompressor in self._decompressors:
+            data = decompressor.decompress(data) + decompressor.flush()
+        return data
+
+
+class _OutputLimitError(Exception):
+    """Raised to stop decompression once the output limit is exceeded."""
+
+
+class _LimitedOutput:
+    """Collects decompressed blocks, stopping once a limit is exceeded."""
+
+    def __init__(self) -> None:
+        """Initializes the _LimitedOutput."""
+        self.limit = -1
+        self._blocks: list[bytes] = []
+        self._size = 0
+
+    def write(self, data: bytes) -> int:
+        """Adds a block of output."""
+        self._blocks.append(bytes(data))
+        self._size += len(data)
+        if 0 <= self.limit < self._size:
+            raise _OutputLimitError
+        return len(data)
+
+    def take(self) -> bytes:
+        """Returns and clears the output collected so far."""
+        output = b"".join(self._blocks)
+        self._blocks = []
+        self._size = 0
+        return output
+
+
+def _decompress_slices(
+    decompress: Callable[[bytes], bytes], data: bytes, max_length: int
+) -> bytes:
+    """Decompresses a chunk a slice at a time, stopping past ``max_length``."""
+    output = []
+    size = 0
+    for start in range(0, len(data), _SLICE_SIZE):
+        block = decompress(data[start : start + _SLICE_SIZE])
+        output.append(block)
+        size += len(block)
+        if size > max_length:
+            break
+    return b"".join(output)
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Lists the content encodings that can be decoded, most preferred first.
+
+    Returns:
+        A tuple of content-coding names.
+    """
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.extend(("gzip", "deflate"))
+    return tuple(encodings)
+
+
+def accept_encoding() -> str:
+    """Builds an ``Accept-Encoding`` header preferring the best encodings.
+
+    Returns:
+        The header value, with quality values in order of preference.
+    """
+    encodings = supported_encodings()
+    return ", ".join(
+        f"{encoding};q={1 - i / 10:.1f}" if i else encoding
+        for i, encoding in enumerate(encodings)
+    )
+
+
+def get_decompressor(content_encoding: str | None) -> Decompressor:
+    """Gets a decompressor for a ``Content-Encoding`` header value.
+
+    Unknown encodings are passed through unchanged.
+
+    Args:
+        content_encoding: The value of the ``Content-Encoding`` header.
+
+    Returns:
+        A decompressor for the encoding.
+    """
+    decompressors: list[Decompressor] = []
+    # Encodings are listed in the order they were applied, so undo them in
+    # reverse.
+    for encoding in reversed((content_encoding or "").lower().split(",")):
+        encoding = encoding.strip()
+        if encoding in ("gzip", "x-gzip", "deflate"):
+            decompressors.append(ZlibDecompressor(encoding.replace("x-", "")))
+        elif encoding == "br" and brotli is not None:
+            decompressors.append(BrotliDecompressor())
+        elif encoding == "zstd" and zstandard is not None:
+            decompressors.append(ZstdDecompressor())
+
+    if not decompressors:
+        return IdentityDecompressor()
+    if len(decompressors) == 1:
+        return decompressors[0]
+    return MultiDecompressor(decompressors)
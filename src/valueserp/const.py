@@ -10,3 +10,21 @@ API_PATH = {
 
 DEFAULT_TIMEOUT = 120.0
 DEFAULT_RETRIES = 3
+DEFAULT_MAX_RESPONSE_SIZE = None
+DEFAULT_LOCATION_TTL = 7 * 24 * 60 * 60.0
+DEFAULT_MAX_CONCURRENCY = 10
+DEFAULT_BULK_SHARE = 0.8
+DEFAULT_HEDGE_PERCENTILE = 95.0
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+DEFAULT_HEDGE_WINDOW = 200
+DEFAULT_BREAKER_FAILURE_RATE = 0.5
+DEFAULT_BREAKER_WINDOW = 20
+DEFAULT_BREAKER_MIN_CALLS = 10
+DEFAULT_BREAKER_RESET_TIMEOUT = 30.0
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_RETRY_BACKOFF = 0.5
+DEFAULT_RETRY_MAX_BACKOFF = 30.0
+DEFAULT_CACHE_TTL = 60 * 60.0
+DEFAULT_CACHE_SIZE = 1024
@@ -0,0 +1,379 @@
+"""Provides the I/O-free core shared by the sync and async clients.
+
+The two clients differ only in how they perform I/O. Everything else is kept
+here and shared, so it behaves identically in both: configuring the HTTP
+session, building requests, running the middleware pipeline, checking and
+reading response bodies, and parsing results.
+
+A request runs through the middleware pipeline as a generator that yields the
+I/O it needs, either :class:`Send` or :class:`Sleep`, and returns the response
+body. :func:`drive` performs that I/O synchronously and :func:`adrive`
+asynchronously, so middleware is written once and used by both clients.
+"""
+
+from __future__ import annotations
+
+__all__ = ["ClientCore", "Flow", "Request", "Send", "Sleep", "adrive", "drive"]
+
+import asyncio
+import contextlib
+import dataclasses
+import functools
+import json
+import time
+from collections.abc import Awaitable, Callable, Generator, Iterator, Mapping
+from typing import TYPE_CHECKING, Any, NoReturn, Union
+
+import httpx
+
+from valueserp import compression, const, exceptions, utils
+from valueserp.const import (
+    DEFAULT_KEEPALIVE_EXPIRY,
+    DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    DEFAULT_MAX_RESPONSE_SIZE,
+    DEFAULT_RETRIES,
+    DEFAULT_TIMEOUT,
+)
+from valueserp.credentials import Credentials
+from valueserp.locations import parse_locations
+from valueserp.models import Location
+from valueserp.serp import WebSERP
+from valueserp.stats import ResponseStats
+
+if TYPE_CHECKING:
+    from valueserp.middleware import Middleware
+
+
+@dataclasses.dataclass(frozen=True)
+class Request:
+    """A request to the VALUE SERP API.
+
+    Attributes:
+        method: The type of HTTP request, such as 'GET' or 'POST'.
+        path: The API path to request, starting with a '/' character.
+        params: Parameters to attach to the request as query strings.
+        headers: Headers to provide with the request.
+        data: JSON data to send along with the request.
+    """
+
+    method: str
+    path: str
+    params: Mapping[str, Any] | None = None
+    headers: Mapping[str, str] | None = None
+    data: Mapping[str, Any] | None = None
+
+
+@dataclasses.dataclass(frozen=True)
+class Send:
+    """Asks the driver to send a request and resume with its response body.
+
+    Attributes:
+        request: The request to send.
+    """
+
+    request: Request
+
+
+@dataclasses.dataclass(frozen=True)
+class Sleep:
+    """Asks the driver to wait before resuming.
+
+    Attributes:
+        seconds: The number of seconds to wait.
+    """
+
+    seconds: float
+
+
+Flow = Generator[Union[Send, Sleep], Any, str]
+"""A request in progress, yielding the I/O it needs and returning the body."""
+
+
+def drive(flow: Flow, send: Callable[[Request], str]) -> str:
+    """Runs a request flow, performing its I/O synchronously.
+
+    Args:
+        flow: The request flow to run.
+        send: Sends a request and returns its response body.
+
+    Returns:
+        The response body returned by the flow.
+    """
+    result = error = None
+    while True:
+        try:
+            action = flow.send(result) if error is None else flow.throw(error)
+        except StopIteration as e:
+            return e.value
+        result = error = None
+        try:
+            if isinstance(action, Sleep):
+                time.sleep(action.seconds)
+            else:
+                result = send(action.request)
+        except Exception as e:
+            error = e
+        except BaseException:
+            flow.close()
+            raise
+
+
+async def adrive(flow: Flow, send: Callable[[Request], Awaitable[str]]) -> str:
+    """Runs a request flow, performing its I/O asynchronously.
+
+    Args:
+        flow: The request flow to run.
+        send: Sends a request and returns its response body.
+
+    Returns:
+        The response body returned by the flow.
+    """
+    result = error = None
+    while True:
+        try:
+            action = flow.send(result) if error is None else flow.throw(error)
+        except StopIteration as e:
+            return e.value
+        result = error = None
+        try:
+            if isinstance(action, Sleep):
+                await asyncio.sleep(action.seconds)
+            else:
+                result = await send(action.request)
+        except Exception as e:
+            error = e
+        except BaseException:
+            flow.close()
+            raise
+
+
+def _chain(layers: list[Middleware], request: Request) -> Flow:
+    """Runs a request through the remaining middleware layers."""
+    if not layers:
+        return (yield Send(request))
+    call_next = functools.partial(_chain, layers[1:])
+    return (yield from layers[0].handle(request, call_next))
+
+
+class ClientCore:
+    """The configuration and I/O-free logic shared by the clients.
+
+    Attributes:
+        credentials: An initialized :class:`valueserp.Credentials` object.
+        location_index: An optional :class:`~valueserp.locations.LocationIndex`
+            used to cache and resolve locations locally.
+        max_response_size: The maximum size in bytes of a response body, or
+            None for no limit.
+        on_response: An optional callable that receives a
+            :class:`~valueserp.stats.ResponseStats` after each response.
+        middleware: A list of :class:`~valueserp.middleware.Middleware` that
+            every request passes through, outermost first.
+        circuit_breaker: An optional
+            :class:`~valueserp.circuitbreaker.CircuitBreaker` that stops
+            requests from being sent while the API is unhealthy. It guards
+            each request as it is sent, so it measures only the time spent
+            on the network, not time spent in middleware or queued by a
+            scheduler.
+        warmup: The number of connections to open when entering the context
+            manager, so the first requests skip connection setup.
+        keepalive_interval: The number of seconds between background
+            requests that keep pooled connections open, or None to let idle
+            connections expire. This should be shorter than the
+            ``keepalive_expiry`` passed to the HTTP client.
+        compact_serps: Whether SERPs from ``web_search`` are compacted with
+            :meth:`~valueserp.serp.WebSERP.compact`, keeping only the ``raw``
+            data needed by :meth:`~valueserp.serp.WebSERP.info`.
+    """
+
+    def __init__(self, credentials: Credentials, **kwargs) -> None:
+        """Initializes the client.
+
+        Args:
+            credentials: An initialized :class:`valueserp.Credentials` object.
+            **kwargs: Additional keyword arguments to pass to the HTTP client,
+                such as ``timeout``, ``retries``, ``accept_encoding``,
+                ``max_keepalive_connections`` or ``keepalive_expiry``, and
+                values for the optional attributes above.
+        """
+        self.credentials = credentials
+        self.location_index = kwargs.get("location_index")
+        self.max_response_size = kwargs.get(
+            "max_response_size", DEFAULT_MAX_RESPONSE_SIZE
+        )
+        self.on_response = kwargs.get("on_response")
+        self.middleware = list(kwargs.get("middleware", ()))
+        self.circuit_breaker = kwargs.get("circuit_breaker")
+        self.warmup = kwargs.get("warmup", 0)
+        self.keepalive_interval = kwargs.get("keepalive_interval")
+        self.compact_serps = kwargs.get("compact_serps", False)
+
+    @staticmethod
+    def _transport_options(kwargs: Mapping[str, Any]) -> dict[str, Any]:
+        """Gets the options for the HTTP transport."""
+        return {
+            "retries": kwargs.get("retries", DEFAULT_RETRIES),
+            "limits": httpx.Limits(
+                max_keepalive_connections=kwargs.get(
+                    "max_keepalive_connections", DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+                ),
+                keepalive_expiry=kwargs.get(
+                    "keepalive_expiry", DEFAULT_KEEPALIVE_EXPIRY
+                ),
+            ),
+        }
+
+    def _session_options(self, kwargs: Mapping[str, Any]) -> dict[str, Any]:
+        """Gets the options for the HTTP session."""
+        return {
+            "base_url": const.ENDPOINT,
+            "params": {"api_key": self.credentials.api_key},
+            "headers": {
+                "Accept-Encoding": kwargs.get(
+                    "accept_encoding", compression.accept_encoding()
+                )
+            },
+            "timeout": kwargs.get("timeout", DEFAULT_TIMEOUT),
+        }
+
+    def _flow(self, request: Request) -> Flow:
+        """Starts a request flow through the middleware pipeline."""
+        return _chain(self.middleware, request)
+
+    def _guard(self) -> contextlib.AbstractContextManager[None]:
+        """Guards a request with the ``circuit_breaker``, if there is one."""
+        if self.circuit_breaker is None:
+            return contextlib.nullcontext()
+        return self.circuit_breaker.call()
+
+    @staticmethod
+    def _web_search_params(
+        query: str,
+        location: str | Location | None,
+        site: str | None,
+        kwargs: Mapping[str, Any],
+    ) -> dict[str, Any]:
+        """Builds the parameters of a web search."""
+        if site:
+            query = f"site:{utils.normalize_site(site)} {query}"
+        if isinstance(location, Location):
+            location = location.full_name
+
+        search_params = {
+            "q": query,
+            "location": location,
+        }
+        # We don't want to override anything essential.
+        kwargs = {k: v for k, v in kwargs.items() if k not in search_params}
+        search_params.update(kwargs)
+        return search_params
+
+    def _web_serp(self, raw: Mapping[str, Any]) -> WebSERP:
+        """Builds a web SERP, compacting it if ``compact_serps`` is set."""
+        serp = WebSERP(raw)
+        if self.compact_serps:
+            serp.compact()
+        return serp
+
+    @staticmethod
+    def _locations_params(
+        query: str, type: str | None, country_code: str | None
+    ) -> dict[str, Any]:
+        """Builds the parameters of a locations search."""
+        params = {"q": query}
+        if type:
+            params["type"] = type
+        if country_code:
+            params["country_code"] = country_code
+        return params
+
+    def _cached_locations(
+        self, query: str, type: str | None, country_code: str | None
+    ) -> list[Location] | None:
+        """Gets fresh locations from the ``location_index``, if there is one."""
+        if self.location_index is None:
+            return None
+        return self.location_index.get(query, type=type, country_code=country_code)
+
+    def _parse_locations(
+        self, body: str, query: str, type: str | None, country_code: str | None
+    ) -> list[Location]:
+        """Parses a locations response, adding it to the ``location_index``."""
+        locations = parse_locations(json.loads(body))
+        if self.location_index is not None:
+            self.location_index.put(
+                query, locations, type=type, country_code=country_code
+            )
+        return locations
+
+    def _indexed_location(self, text: str) -> Location | None:
+        """Resolves a location from the ``location_index``, if there is one."""
+        if self.location_index is None:
+            return None
+        matches = self.location_index.lookup(text)
+        return matches[0] if matches else None
+
+    def _ping_request(self, session: httpx.Client | httpx.AsyncClient) -> httpx.Request:
+        """Builds a HEAD request that opens or refreshes a pooled connection."""
+        request = session.build_request("HEAD", "/")
+        # Don't send the API key with requests that aren't API calls.
+        request.url = request.url.copy_remove_param("api_key")
+        return request
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _translate_errors() -> Iterator[None]:
+        """Translates HTTP client errors into this package's exceptions."""
+        try:
+            yield
+        except httpx.HTTPStatusError as e:
+            utils.parse_response_error(e)
+        except httpx.TimeoutException as e:
+            raise exceptions.RequestTimeoutError() from e
+        except httpx.RequestError as e:
+            raise exceptions.RequestError() from e
+
+    @staticmethod
+    def _raise_error(response: httpx.Response, body: utils.BodyReader) -> NoReturn:
+        """Raises the exception for an error response from what was read of it."""
+        try:
+            content = body.getvalue()
+        except exceptions.VSError:
+            # The body was too large or could not be decompressed.
+            content = b""
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            utils.parse_response_error(e, content)
+
+    def _body_reader(self, response: httpx.Response) -> utils.BodyReader:
+        """Creates a reader for a response body, checking its headers."""
+        body = utils.BodyReader(
+            self.max_response_size, response.headers.get("content-encoding")
+        )
+        body.check_headers(response.headers)
+        return body
+
+    def _finish(
+        self,
+        request: Request,
+        response: httpx.Response,
+        body: utils.BodyReader,
+        start: float,
+        queue_time: float = 0.0,
+    ) -> str:
+        """Reports the response to ``on_response`` and decodes its body."""
+        if self.on_response is not None:
+            self.on_response(
+                ResponseStats(
+                    method=request.method,
+                    path=request.path,
+                    status_code=response.status_code,
+                    content_encoding=response.headers.get("content-encoding"),
+                    compressed_bytes=body.compressed_size,
+                    decompressed_bytes=body.size,
+                    elapsed=time.perf_counter() - start,
+                    decode_time=body.decode_time,
+                    queue_time=queue_time,
+                )
+            )
+        return body.getvalue().decode(response.encoding or "utf-8")
@@ -4,11 +4,8 @@ from __future__ import annotations
 
 __all__ = ["Credentials"]
 
-import httpx
-
 from valueserp import exceptions
 from valueserp.const import API_PATH, ENDPOINT
-from valueserp.utils import parse_response_error
 
 
 class Credentials:
@@ -42,6 +39,11 @@ class Credentials:
 
         .. _account API endpoint: https://www.valueserp.com/docs/account-api
         """
+        # Imported here so creating credentials doesn't import the HTTP stack.
+        import httpx
+
+        from valueserp.utils import parse_response_error
+
         params = {"api_key": self.api_key}
         account_path = ENDPOINT + API_PATH["account"]
         try:
@@ -0,0 +1,238 @@
+"""Provides change detection between two SERPs for the same search.
+
+Organic results are matched by a hash of their normalized URL, so comparing
+two SERPs takes linear time however many results they have. Runs of many
+searches, such as the NDJSON output of the ``valueserp`` command, can be
+compared with :func:`diff_runs`, which only keeps a compact summary of the
+older run in memory.
+
+Example:
+    >>> diff = diff_serps(yesterday, today)
+    >>> for change in diff.moved:
+    ...     print(change.url, change.delta)
+"""
+
+from __future__ import annotations
+
+__all__ = ["RankChange", "SERPDiff", "diff_serps", "diff_runs", "read_run", "url_key"]
+
+import dataclasses
+import hashlib
+import json
+import urllib.parse
+from collections.abc import Hashable, Iterable, Iterator, Mapping
+from typing import IO
+
+from valueserp.serp import WebSERP
+
+
+def url_key(url: str) -> bytes:
+    """Gets the identity of a URL for matching results between SERPs.
+
+    The scheme and host are lowercased, and the fragment and any trailing
+    slash are removed, so trivially different forms of a URL match.
+
+    Args:
+        url: The URL.
+
+    Returns:
+        A short hash of the normalized URL.
+    """
+    parts = urllib.parse.urlsplit(url.strip())
+    normalized = urllib.parse.urlunsplit(
+        (
+            parts.scheme.lower(),
+            parts.netloc.lower(),
+            parts.path.rstrip("/"),
+            parts.query,
+            "",
+        )
+    )
+    return hashlib.blake2b(normalized.encode(), digest_size=8).digest()
+
+
+@dataclasses.dataclass(frozen=True)
+class RankChange:
+    """Represents the position of a URL in the older and newer SERPs.
+
+    Attributes:
+        url: The URL of the result, as shown in the newer SERP if it is there.
+        old_position: The position of the result in the older SERP, or None
+            if it entered.
+        new_position: The position of the result in the newer SERP, or None
+            if it exited.
+    """
+
+    url: str
+    old_position: int | None
+    new_position: int | None
+
+    @property
+    def delta(self) -> int | None:
+        """The number of positions gained; negative if the result dropped.
+
+        This is None unless the result has a position in both SERPs, as for
+        results that entered or exited.
+        """
+        if self.old_position is None or self.new_position is None:
+            return None
+        return self.old_position - self.new_position
+
+
+@dataclasses.dataclass
+class SERPDiff:
+    """The changes from an older SERP to a newer one.
+
+    Attributes:
+        entered: Results of the newer SERP whose URLs were not in the older.
+        exited: Results of the older SERP whose URLs are not in the newer.
+        moved: URLs ranking in both SERPs at different positions.
+        unchanged: The number of URLs ranking at the same position.
+        old_snippet_url: The source URL of the older featured snippet.
+        new_snippet_url: The source URL of the newer featured snippet.
+        paa_added: "People also ask" questions only in the newer SERP.
+        paa_removed: "People also ask" questions only in the older SERP.
+        related_added: Related searches only in the newer SERP.
+        related_removed: Related searches only in the older SERP.
+    """
+
+    entered: list[RankChange] = dataclasses.field(default_factory=list)
+    exited: list[RankChange] = dataclasses.field(default_factory=list)
+    moved: list[RankChange] = dataclasses.field(default_factory=list)
+    unchanged: int = 0
+    old_snippet_url: str | None = None
+    new_snippet_url: str | None = None
+    paa_added: list[str] = dataclasses.field(default_factory=list)
+    paa_removed: list[str] = dataclasses.field(default_factory=list)
+    related_added: list[str] = dataclasses.field(default_factory=list)
+    related_removed: list[str] = dataclasses.field(default_factory=list)
+
+    @property
+    def snippet_changed(self) -> bool:
+        """Whether the featured snippet appeared, disappeared or changed owner."""
+        old, new = self.old_snippet_url, self.new_snippet_url
+        if old is None or new is None:
+            return old is not new
+        return url_key(old) != url_key(new)
+
+    @property
+    def changed(self) -> bool:
+        """Whether anything changed between the two SERPs."""
+        return bool(
+            self.entered
+            or self.exited
+            or self.moved
+            or self.snippet_changed
+            or self.paa_added
+            or self.paa_removed
+            or self.related_added
+            or self.related_removed
+        )
+
+
+class _Snapshot:
+    """The parts of a SERP needed to compare it with another.
+
+    Only this summary of the older run is kept in memory by :func:`diff_runs`.
+    """
+
+    __slots__ = ("links", "snippet_url", "questions", "related")
+
+    def __init__(self, serp: WebSERP) -> None:
+        """Initializes the _Snapshot."""
+        # Maps each URL hash to its best position and its URL.
+        self.links: dict[bytes, tuple[int | None, str]] = {}
+        for link in serp.links:
+            if link.url:
+                self.links.setdefault(url_key(link.url), (link.position, link.url))
+        snippet = serp.featured_snippet
+        self.snippet_url = snippet.source_url if snippet else None
+        self.questions = frozenset(
+            item.question for item in serp.people_also_ask or () if item.question
+        )
+        self.related = frozenset(serp.related_searches or ())
+
+
+def _diff(old: _Snapshot, new: _Snapshot) -> SERPDiff:
+    """Compares two SERP snapshots."""
+    diff = SERPDiff(
+        old_snippet_url=old.snippet_url,
+        new_snippet_url=new.snippet_url,
+        paa_added=sorted(new.questions - old.questions),
+        paa_removed=sorted(old.questions - new.questions),
+        related_added=sorted(new.related - old.related),
+        related_removed=sorted(old.related - new.related),
+    )
+    for key, (position, url) in new.links.items():
+        previous = old.links.get(key)
+        if previous is None:
+            diff.entered.append(RankChange(url, None, position))
+        elif previous[0] != position:
+            diff.moved.append(RankChange(url, previous[0], position))
+        else:
+            diff.unchanged += 1
+    for key, (position, url) in old.links.items():
+        if key not in new.links:
+            diff.exited.append(RankChange(url, position, None))
+    return diff
+
+
+def diff_serps(old: WebSERP, new: WebSERP) -> SERPDiff:
+    """Compares two SERPs for the same search.
+
+    Args:
+        old: The older SERP.
+        new: The newer SERP.
+
+    Returns:
+        The changes from the older SERP to the newer one.
+    """
+    return _diff(_Snapshot(old), _Snapshot(new))
+
+
+def diff_runs(
+    old: Iterable[tuple[Hashable, WebSERP]] | Mapping[Hashable, WebSERP],
+    new: Iterable[tuple[Hashable, WebSERP]] | Mapping[Hashable, WebSERP],
+) -> Iterator[tuple[Hashable, SERPDiff]]:
+    """Compares two runs of the same searches.
+
+    The older run is read first and reduced to a compact summary of each SERP.
+    The newer run is then streamed, so it may be larger than memory.
+
+    Args:
+        old: The older run, as a mapping or as pairs of a search key and its
+            SERP, such as those from :func:`read_run`.
+        new: The newer run, in the same form.
+
+    Yields:
+        The key and changes of each search in both runs, in the order of the
+        newer run. Searches in only one run are skipped.
+    """
+    if isinstance(old, Mapping):
+        old = old.items()
+    if isinstance(new, Mapping):
+        new = new.items()
+
+    snapshots = {key: _Snapshot(serp) for key, serp in old}
+    for key, serp in new:
+        snapshot = snapshots.pop(key, None)
+        if snapshot is not None:
+            yield key, _diff(snapshot, _Snapshot(serp))
+
+
+def read_run(file: IO[str]) -> Iterator[tuple[str, WebSERP]]:
+    """Reads the SERPs of a run written by the ``valueserp`` command.
+
+    Args:
+        file: An NDJSON file written by the ``valueserp`` command.
+
+    Yields:
+        The key and SERP of each successful search. Failed searches are
+        skipped.
+    """
+    for line in file:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if "response" in record:
+            yield record["key"], WebSERP(record["response"])
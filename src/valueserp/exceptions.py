@@ -13,9 +13,13 @@ class VSError(Exception):
 
 
 class APIError(VSError):
-    """The VALUE SERP API responded with an error."""
+    """The VALUE SERP API responded with an error.
 
-    pass
+    Attributes:
+        retryable: Whether the same request may succeed if retried later.
+    """
+
+    retryable = False
 
 
 class InvalidCredentialsError(APIError, ValueError):
@@ -29,11 +33,44 @@ class InvalidCredentialsError(APIError, ValueError):
 class RequestError(APIError):
     """Request to the VALUE SERP API failed."""
 
+    retryable = True
+
     def __init__(self) -> None:
         """Initializes the RequestError exception."""
         super().__init__("API request failed - no response received.")
 
 
+class RequestTimeoutError(RequestError):
+    """Request to the VALUE SERP API did not complete in time."""
+
+    def __init__(self, timeout: float | None = None) -> None:
+        """Initializes the RequestTimeoutError exception."""
+        self.timeout = timeout
+        message = "API request timed out"
+        if timeout is not None:
+            message += f" after {timeout} seconds"
+        APIError.__init__(self, message + ".")
+
+
+class CircuitOpenError(RequestError):
+    """Request was not sent because the circuit breaker is open.
+
+    The error is not retryable, so that requests fail fast rather than
+    waiting for the circuit to close.
+
+    Attributes:
+        retry_after: The number of seconds until the circuit breaker will
+            allow a probe request.
+    """
+
+    retryable = False
+
+    def __init__(self, retry_after: float) -> None:
+        """Initializes the CircuitOpenError exception."""
+        self.retry_after = retry_after
+        APIError.__init__(self, "API request not sent - the circuit breaker is open.")
+
+
 class ResponseError(APIError):
     """Response from the VALUE SERP API was not successful."""
 
@@ -44,3 +81,60 @@ class ResponseError(APIError):
         super().__init__(
             f"API responded with status code {self.status_code}: {self.response_message}"
         )
+
+
+class RateLimitError(ResponseError):
+    """The VALUE SERP API rejected the request due to rate limiting.
+
+    Attributes:
+        retry_after: The number of seconds the API asked to wait before
+            retrying, if given.
+    """
+
+    retryable = True
+
+    def __init__(
+        self,
+        status_code: int,
+        response_message: str,
+        retry_after: float | None = None,
+    ) -> None:
+        """Initializes the RateLimitError exception."""
+        self.retry_after = retry_after
+        super().__init__(status_code, response_message)
+
+
+class QuotaExhaustedError(ResponseError):
+    """The VALUE SERP account has run out of credits."""
+
+
+class ServerError(ResponseError):
+    """The VALUE SERP API, or a gateway in front of it, failed."""
+
+    retryable = True
+
+
+class DecodingError(APIError):
+    """Response from the VALUE SERP API could not be decompressed."""
+
+    def __init__(self) -> None:
+        """Initializes the DecodingError exception."""
+        super().__init__("API response could not be decompressed.")
+
+
+class ResponseTooLargeError(APIError):
+    """Response from the VALUE SERP API exceeded the maximum allowed size."""
+
+    def __init__(self, max_size: int) -> None:
+        """Initializes the ResponseTooLargeError exception."""
+        self.max_size = max_size
+        super().__init__(f"API response exceeded the maximum size of {max_size} bytes.")
+
+
+class QueueFullError(VSError):
+    """The request queue for a priority class is full."""
+
+    def __init__(self, priority: str) -> None:
+        """Initializes the QueueFullError exception."""
+        self.priority = priority
+        super().__init__(f"The {priority} request queue is full.")
@@ -0,0 +1,108 @@
+"""Provides hedged requests to cut tail latency.
+
+A hedged request sends a second, identical request when the first has taken
+longer than most requests do, and uses whichever response arrives first. Only
+the slowest few percent of requests are duplicated, so the extra load is small
+while the worst-case latency drops sharply.
+"""
+
+from __future__ import annotations
+
+__all__ = ["HedgePolicy", "LatencyTracker"]
+
+import collections
+import math
+
+from valueserp.const import (
+    DEFAULT_HEDGE_MIN_SAMPLES,
+    DEFAULT_HEDGE_PERCENTILE,
+    DEFAULT_HEDGE_WINDOW,
+)
+
+
+class LatencyTracker:
+    """Tracks recent request latencies.
+
+    Attributes:
+        window: The number of most recent latencies kept.
+    """
+
+    def __init__(self, window: int = DEFAULT_HEDGE_WINDOW) -> None:
+        """Initializes the LatencyTracker.
+
+        Args:
+            window: The number of most recent latencies to keep.
+        """
+        self.window = window
+        self._latencies: collections.deque[float] = collections.deque(maxlen=window)
+
+    def __len__(self) -> int:
+        """Returns the number of latencies recorded."""
+        return len(self._latencies)
+
+    def record(self, latency: float) -> None:
+        """Records the latency of a request in seconds."""
+        self._latencies.append(latency)
+
+    def percentile(self, percentile: float) -> float | None:
+        """Gets a percentile of the recorded latencies.
+
+        Args:
+            percentile: The percentile to get, between 0 and 100.
+
+        Returns:
+            The latency in seconds, or None if nothing has been recorded.
+        """
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        index = math.ceil(percentile / 100 * len(ordered)) - 1
+        return ordered[min(max(index, 0), len(ordered) - 1)]
+
+
+class HedgePolicy:
+    """Decides when to send a hedged request.
+
+    Until ``min_samples`` latencies have been recorded, the ``delay`` is used
+    as the hedging threshold. If no delay is given, requests are not hedged
+    until enough latencies have been recorded.
+
+    Attributes:
+        percentile: The latency percentile after which to hedge.
+        delay: The fallback threshold in seconds.
+        min_samples: The number of latencies needed to use the percentile.
+        latencies: The tracker of recent latencies.
+        hedges: The number of hedged requests sent so far.
+    """
+
+    def __init__(
+        self,
+        percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        delay: float | None = None,
+        min_samples: int = DEFAULT_HEDGE_MIN_SAMPLES,
+        window: int = DEFAULT_HEDGE_WINDOW,
+    ) -> None:
+        """Initializes the HedgePolicy.
+
+        Args:
+            percentile: The latency percentile after which to hedge.
+            delay: The fallback threshold in seconds.
+            min_samples: The number of latencies needed to use the percentile.
+            window: The number of most recent latencies to consider.
+        """
+        self.percentile = percentile
+        self.delay = delay
+        self.min_samples = min_samples
+        self.latencies = LatencyTracker(window)
+        self.hedges = 0
+
+    def threshold(self) -> float | None:
+        """Gets how long to wait before sending a hedged request.
+
+        Returns:
+            The threshold in seconds, or None if the request should not be
+            hedged.
+        """
+        if len(self.latencies) >= self.min_samples:
+            return self.latencies.percentile(self.percentile)
+        return self.delay
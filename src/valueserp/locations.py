@@ -0,0 +1,309 @@
+"""Provides a local, persistent index of VALUE SERP locations.
+
+Resolving a free-text location through the locations API costs a network round
+trip. The :class:`LocationIndex` stores locations returned by the API in a
+SQLite database so that repeated lookups can be answered locally.
+"""
+
+from __future__ import annotations
+
+__all__ = ["LocationIndex", "normalize_location_name", "parse_locations"]
+
+import difflib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from valueserp.const import DEFAULT_LOCATION_TTL
+from valueserp.models import Location
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS locations (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_norm TEXT NOT NULL,
+    type TEXT,
+    full_name TEXT NOT NULL,
+    full_name_norm TEXT NOT NULL,
+    parent_id INTEGER,
+    country_code TEXT,
+    reach INTEGER,
+    lat REAL,
+    lng REAL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS locations_name_norm ON locations (name_norm);
+CREATE INDEX IF NOT EXISTS locations_full_name_norm ON locations (full_name_norm);
+CREATE TABLE IF NOT EXISTS queries (
+    key TEXT PRIMARY KEY,
+    ids TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+_COLUMNS = "id, name, type, full_name, parent_id, country_code, reach, lat, lng"
+
+
+def normalize_location_name(name: str) -> str:
+    """Normalizes a location name for comparison.
+
+    Casing and whitespace are ignored, as is spacing around the commas that
+    separate the parts of a full location name.
+
+    Args:
+        name: The location name to normalize.
+
+    Returns:
+        The normalized location name.
+    """
+    parts = (" ".join(part.split()) for part in name.casefold().split(","))
+    return ",".join(part for part in parts if part)
+
+
+def parse_locations(response: Mapping[str, Any]) -> list[Location]:
+    """Parses a locations API response into :class:`~valueserp.models.Location` objects.
+
+    Args:
+        response: The locations API response as a dict parsed from JSON.
+
+    Entries without an ID, a name or a full name cannot be used or indexed,
+    so they are skipped.
+
+    Returns:
+        A list of the locations in the response.
+    """
+    locations = []
+    for raw in response.get("locations", []):
+        if raw.get("id") is None or not raw.get("name") or not raw.get("full_name"):
+            continue
+        gps = raw.get("gps")
+        locations.append(
+            Location(
+                id=raw.get("id"),
+                name=raw.get("name"),
+                type=raw.get("type"),
+                full_name=raw.get("full_name"),
+                parent_id=raw.get("parent_id"),
+                country_code=raw.get("country_code"),
+                reach=raw.get("reach"),
+                gps=(gps[0], gps[1]) if gps and len(gps) == 2 else None,
+            )
+        )
+
+    return locations
+
+
+class LocationIndex:
+    """A persistent local index of locations returned by the API.
+
+    The index serves two purposes. Results of locations API queries are cached
+    for ``ttl`` seconds, after which they are considered stale and the clients
+    will fetch them again. Every location that has been seen is also indexed by
+    name, so free-text locations can be resolved with :meth:`lookup` without
+    making any request at all, until they too become stale.
+
+    The index is safe to share between threads and between clients.
+
+    Attributes:
+        path: The path of the SQLite database backing the index.
+        ttl: The number of seconds for which cached queries remain fresh.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str] = ":memory:",
+        ttl: float = DEFAULT_LOCATION_TTL,
+    ) -> None:
+        """Initializes the LocationIndex.
+
+        Args:
+            path: The path of the SQLite database file. The default keeps the
+                index in memory for the lifetime of the object.
+            ttl: The number of seconds for which cached queries remain fresh.
+        """
+        self.path = os.fspath(path)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._db:
+            self._db.executescript(_SCHEMA)
+
+    def get(
+        self,
+        query: str,
+        type: str | None = None,
+        country_code: str | None = None,
+    ) -> list[Location] | None:
+        """Gets the cached result of a locations API query.
+
+        Args:
+            query: The query that was sent to the locations API.
+            type: The location type the query was filtered to, if any.
+            country_code: The country code the query was filtered to, if any.
+
+        Returns:
+            The cached locations, or None if the query has not been cached or
+            the cached result is stale.
+        """
+        key = self._query_key(query, type, country_code)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT ids, fetched_at FROM queries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or time.time() - row[1] > self.ttl:
+                return None
+            ids = json.loads(row[0])
+            by_id = {
+                location.id: location
+                for location in self._select(f"id IN ({','.join('?' * len(ids))})", ids)
+            }
+
+        return [by_id[location_id] for location_id in ids if location_id in by_id]
+
+    def put(
+        self,
+        query: str,
+        locations: Iterable[Location],
+        type: str | None = None,
+        country_code: str | None = None,
+    ) -> None:
+        """Caches the result of a locations API query.
+
+        Args:
+            query: The query that was sent to the locations API.
+            locations: The locations returned by the API.
+            type: The location type the query was filtered to, if any.
+            country_code: The country code the query was filtered to, if any.
+        """
+        locations = list(locations)
+        key = self._query_key(query, type, country_code)
+        ids = json.dumps([location.id for location in locations])
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO locations ({_COLUMNS}, name_norm,"
+                " full_name_norm, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        location.id,
+                        location.name,
+                        location.type,
+                        location.full_name,
+                        location.parent_id,
+                        location.country_code,
+                        location.reach,
+                        *(location.gps or (None, None)),
+                        normalize_location_name(location.name),
+                        normalize_location_name(location.full_name),
+                        now,
+                    )
+                    for location in locations
+                ],
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO queries (key, ids, fetched_at) VALUES (?, ?, ?)",
+                (key, ids, now),
+            )
+
+    def lookup(self, text: str, limit: int = 1) -> list[Location]:
+        """Resolves free text to the best matching indexed locations.
+
+        Candidates are tried in order of confidence: an exact match on the full
+        location name, an exact match on the short name, a prefix match on
+        either name, and finally a fuzzy match on the short name. Within each
+        stage, locations with a larger reach are preferred.
+
+        No request is made; only locations already in the index are considered.
+        Locations last fetched more than ``ttl`` seconds ago are stale and are
+        not matched, so the clients refresh them from the API.
+
+        Args:
+            text: The free-text location to resolve.
+            limit: The maximum number of locations to return.
+
+        Returns:
+            The best matching locations, most likely first. The list is empty
+            if nothing in the index matches.
+        """
+        norm = normalize_location_name(text)
+        if not norm:
+            return []
+
+        order = f"ORDER BY reach IS NULL, reach DESC LIMIT {int(limit)}"
+        upper = norm + "\uffff"
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for where, args in (
+                ("full_name_norm = ?", (norm,)),
+                ("name_norm = ?", (norm,)),
+                (
+                    "(full_name_norm >= ? AND full_name_norm < ?)"
+                    " OR (name_norm >= ? AND name_norm < ?)",
+                    (norm, upper, norm, upper),
+                ),
+            ):
+                matches = self._select(
+                    f"fetched_at >= ? AND ({where}) {order}", (cutoff, *args)
+                )
+                if matches:
+                    return matches
+
+            # Only compare against names sharing the first character to keep
+            # the fuzzy fallback cheap on large indexes.
+            names = [
+                row[0]
+                for row in self._db.execute(
+                    "SELECT DISTINCT name_norm FROM locations"
+                    " WHERE name_norm >= ? AND name_norm < ? AND fetched_at >= ?",
+                    (norm[0], norm[0] + "\uffff", cutoff),
+                )
+            ]
+            close = difflib.get_close_matches(norm, names, n=limit)
+            if not close:
+                return []
+            matches = self._select(
+                f"fetched_at >= ? AND name_norm IN ({','.join('?' * len(close))})"
+                f" {order}",
+                (cutoff, *close),
+            )
+
+        return matches
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        with self._lock:
+            self._db.close()
+
+    def _select(self, where: str, args: Iterable[Any]) -> list[Location]:
+        """Selects indexed locations matching a SQL condition."""
+        rows = self._db.execute(
+            f"SELECT {_COLUMNS} FROM locations WHERE {where}", tuple(args)
+        )
+        return [
+            Location(
+                id=row[0],
+                name=row[1],
+                type=row[2],
+                full_name=row[3],
+                parent_id=row[4],
+                country_code=row[5],
+                reach=row[6],
+                gps=(row[7], row[8]) if row[7] is not None else None,
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    def _query_key(query: str, type: str | None, country_code: str | None) -> str:
+        """Builds the cache key for a locations API query."""
+        return json.dumps(
+            [
+                normalize_location_name(query),
+                (type or "").casefold(),
+                (country_code or "").casefold(),
+            ]
+        )
@@ -0,0 +1,251 @@
+"""Provides middleware that requests pass through in both clients.
+
+Middleware is written once as a generator and runs unchanged in both
+:class:`~valueserp.GoogleClient` and :class:`~valueserp.AsyncGoogleClient`.
+Rather than sleeping or sending requests itself, middleware yields a
+:class:`~valueserp.core.Sleep` or passes the request on to the next layer,
+and the client performs the I/O in its own way.
+
+Middleware is given to a client as a list, outermost first::
+
+    client = GoogleClient(
+        credentials,
+        middleware=[
+            CacheMiddleware(),
+            RetryMiddleware(),
+            RateLimitMiddleware(rate=10),
+        ],
+    )
+
+Here cached responses skip rate limiting entirely, and every retry is rate
+limited.
+"""
+
+from __future__ import annotations
+
+__all__ = [
+    "CacheMiddleware",
+    "MetricsMiddleware",
+    "Middleware",
+    "RateLimitMiddleware",
+    "RetryMiddleware",
+]
+
+import collections
+import threading
+import time
+from collections.abc import Callable
+
+from valueserp import exceptions, utils
+from valueserp.const import (
+    DEFAULT_CACHE_SIZE,
+    DEFAULT_CACHE_TTL,
+    DEFAULT_RETRY_ATTEMPTS,
+    DEFAULT_RETRY_BACKOFF,
+    DEFAULT_RETRY_MAX_BACKOFF,
+)
+from valueserp.core import Flow, Request, Sleep
+
+# Requests that can safely be sent more than once.
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class Middleware:
+    """The base class for middleware.
+
+    Subclasses override :meth:`handle`. Any object with a matching ``handle``
+    method, such as a :class:`~valueserp.circuitbreaker.CircuitBreaker`, can
+    be used as middleware.
+    """
+
+    def handle(self, request: Request, call_next: Callable[[Request], Flow]) -> Flow:
+        """Handles a request.
+
+        Args:
+            request: The request to handle.
+            call_next: Passes a request on to the next layer, returning a flow
+                to ``yield from`` for the response body.
+
+        Returns:
+            A flow returning the response body.
+        """
+        return (yield from call_next(request))
+
+
+class RetryMiddleware(Middleware):
+    """Retries requests that fail with a retryable error.
+
+    Only errors that are :attr:`~valueserp.exceptions.APIError.retryable` are
+    retried, and only for requests that can safely be sent again. The delay
+    doubles after each attempt, but is never shorter than the time the API
+    asks clients to wait after rate limiting them.
+
+    Attributes:
+        attempts: The maximum number of retries after the first attempt.
+        backoff: The number of seconds to wait before the first retry.
+        max_backoff: The maximum number of seconds to wait between attempts.
+    """
+
+    def __init__(
+        self,
+        attempts: int = DEFAULT_RETRY_ATTEMPTS,
+        backoff: float = DEFAULT_RETRY_BACKOFF,
+        max_backoff: float = DEFAULT_RETRY_MAX_BACKOFF,
+    ) -> None:
+        """Initializes the RetryMiddleware."""
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def handle(self, request: Request, call_next: Callable[[Request], Flow]) -> Flow:
+        """Sends a request, retrying it after retryable errors."""
+        attempt = 0
+        while True:
+            try:
+                return (yield from call_next(request))
+            except exceptions.APIError as e:
+                if (
+                    not e.retryable
+                    or attempt >= self.attempts
+                    or request.method not in _IDEMPOTENT_METHODS
+                ):
+                    raise
+                delay = self.backoff * 2**attempt
+                retry_after = getattr(e, "retry_after", None)
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                attempt += 1
+            yield Sleep(min(delay, self.max_backoff))
+
+
+class RateLimitMiddleware(Middleware):
+    """Limits the rate at which requests are sent.
+
+    Up to ``burst`` requests may be sent at once after a quiet period, after
+    which requests are spaced out to ``rate`` per second. The limiter is safe
+    to share between threads and between clients.
+
+    Attributes:
+        rate: The maximum number of requests per second.
+        burst: The maximum number of requests sent at once.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        """Initializes the RateLimitMiddleware."""
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def handle(self, request: Request, call_next: Callable[[Request], Flow]) -> Flow:
+        """Waits until the request may be sent, then sends it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            # Tokens are reserved before waiting, so concurrent requests queue
+            # up behind each other rather than all waking at once.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            yield Sleep(wait)
+        return (yield from call_next(request))
+
+
+class CacheMiddleware(Middleware):
+    """Caches the response bodies of GET requests in memory.
+
+    Requests are matched by their path and canonical parameters, so
+    equivalent searches share a cache entry. Failed requests are not cached.
+    The cache is safe to share between threads and between clients.
+
+    Attributes:
+        ttl: The number of seconds for which a response is reused.
+        max_entries: The maximum number of responses kept. The least recently
+            used responses are dropped first.
+        hits: The number of requests answered from the cache.
+        misses: The number of requests not answered from the cache.
+    """
+
+    def __init__(
+        self, ttl: float = DEFAULT_CACHE_TTL, max_entries: int = DEFAULT_CACHE_SIZE
+    ) -> None:
+        """Initializes the CacheMiddleware."""
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: collections.OrderedDict[tuple[str, str], tuple[float, str]]
+        self._entries = collections.OrderedDict()
+
+    def handle(self, request: Request, call_next: Callable[[Request], Flow]) -> Flow:
+        """Returns a cached response body, or sends the request and caches it."""
+        if request.method != "GET":
+            return (yield from call_next(request))
+
+        key = (request.path, utils.request_key(request.params or {}))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        body = yield from call_next(request)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body
+
+    def clear(self) -> None:
+        """Removes all cached responses."""
+        with self._lock:
+            self._entries.clear()
+
+
+class MetricsMiddleware(Middleware):
+    """Counts requests and measures their latency.
+
+    Latency is measured from this layer, so it includes the time spent in any
+    middleware placed after it, such as retries and rate limiting.
+
+    Attributes:
+        requests: The number of requests completed, successfully or not.
+        errors: The number of requests that failed, by exception class name.
+        elapsed: The total number of seconds spent on requests.
+    """
+
+    def __init__(self) -> None:
+        """Initializes the MetricsMiddleware."""
+        self.requests = 0
+        self.errors: collections.Counter[str] = collections.Counter()
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def mean_latency(self) -> float | None:
+        """The mean number of seconds per request, or None if there were none."""
+        return self.elapsed / self.requests if self.requests else None
+
+    def handle(self, request: Request, call_next: Callable[[Request], Flow]) -> Flow:
+        """Sends a request, recording its outcome and latency."""
+        start = time.perf_counter()
+        error = None
+        try:
+            return (yield from call_next(request))
+        except exceptions.VSError as e:
+            error = type(e).__name__
+            raise
+        finally:
+            with self._lock:
+                self.requests += 1
+                self.elapsed += time.perf_counter() - start
+                if error is not None:
+                    self.errors[error] += 1
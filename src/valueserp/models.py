@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-__all__ = ["SERPInfo", "OrganicLink", "FeaturedSnippet", "PAAItem"]
+__all__ = ["SERPInfo", "OrganicLink", "FeaturedSnippet", "PAAItem", "Location"]
 
 import dataclasses
 
@@ -77,3 +77,37 @@ class PAAItem:
     question: str | None
     answer: str | None
     source_url: str | None
+
+
+@dataclasses.dataclass
+class Location:
+    """Represents a location supported by the VALUE SERP API.
+
+    Locations are returned by the `locations API`_ and can be passed directly
+    to :meth:`valueserp.GoogleClient.web_search`.
+
+    Attributes:
+        id: The unique ID of the location.
+        name: The short name of the location, e.g. "London".
+        type: The type of location, e.g. "city" or "country".
+        full_name: The canonical name of the location as sent to the API.
+        parent_id: The ID of the parent location, if any.
+        country_code: The two-letter country code of the location.
+        reach: The approximate number of people reached by the location.
+        gps: The latitude and longitude of the location, if known.
+
+    .. _locations API: https://www.valueserp.com/docs/locations-api
+    """
+
+    id: int
+    name: str
+    type: str | None
+    full_name: str
+    parent_id: int | None = dataclasses.field(default=None, repr=False)
+    country_code: str | None = dataclasses.field(default=None, repr=False)
+    reach: int | None = dataclasses.field(default=None, repr=False)
+    gps: tuple[float, float] | None = dataclasses.field(default=None, repr=False)
+
+    def __str__(self) -> str:
+        """Returns the canonical location name used by the API."""
+        return self.full_name
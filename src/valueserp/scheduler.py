@@ -0,0 +1,177 @@
+"""Provides a priority scheduler for sharing an async client between workloads.
+
+A single :class:`~valueserp.AsyncGoogleClient` is often shared between
+latency-sensitive lookups and bulk jobs. Without scheduling, a large batch of
+bulk searches can occupy every connection and starve interactive searches. The
+:class:`PriorityScheduler` admits requests in priority order and caps the share
+of capacity each priority class may use.
+"""
+
+from __future__ import annotations
+
+__all__ = ["Priority", "PriorityScheduler"]
+
+import asyncio
+import collections
+import contextlib
+import enum
+import math
+import time
+from collections.abc import AsyncIterator, Mapping
+
+from valueserp import exceptions
+from valueserp.const import DEFAULT_BULK_SHARE, DEFAULT_MAX_CONCURRENCY
+
+
+class Priority(enum.IntEnum):
+    """Priority classes for requests, most urgent first."""
+
+    INTERACTIVE = 0
+    BULK = 1
+
+
+class PriorityScheduler:
+    """Admits async requests by priority, within per-class limits.
+
+    When capacity frees up, waiting requests of a more urgent class are always
+    admitted before those of a less urgent class. Each class may use at most
+    its share of ``max_concurrency``, so reserving part of the capacity for
+    interactive requests is a matter of giving bulk requests a share below 1.
+
+    Attributes:
+        max_concurrency: The maximum number of requests in flight at once.
+        limits: The maximum number of requests in flight per class.
+        max_queue: The maximum number of waiting requests per class. Classes
+            not listed have unbounded queues.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        shares: Mapping[Priority, float] | None = None,
+        max_queue: Mapping[Priority, int] | None = None,
+    ) -> None:
+        """Initializes the PriorityScheduler.
+
+        Args:
+            max_concurrency: The maximum number of requests in flight at once.
+            shares: The fraction of ``max_concurrency`` each class may use.
+                By default, bulk requests may use 80% of it and interactive
+                requests all of it.
+            max_queue: The maximum number of waiting requests per class.
+        """
+        shares = {Priority.BULK: DEFAULT_BULK_SHARE, **(shares or {})}
+        self.max_concurrency = max_concurrency
+        self.limits = {
+            priority: max(1, math.floor(shares.get(priority, 1.0) * max_concurrency))
+            for priority in Priority
+        }
+        self.max_queue = dict(max_queue or {})
+        self._active = dict.fromkeys(Priority, 0)
+        self._waiters: dict[Priority, collections.deque[asyncio.Future[None]]] = {
+            priority: collections.deque() for priority in Priority
+        }
+
+    @property
+    def active(self) -> int:
+        """The number of requests currently in flight."""
+        return sum(self._active.values())
+
+    def queued(self, priority: Priority | None = None) -> int:
+        """Gets the number of waiting requests.
+
+        Args:
+            priority: Only count requests of this class.
+
+        Returns:
+            The number of requests waiting for capacity.
+        """
+        if priority is not None:
+            return len(self._waiters[priority])
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    @contextlib.asynccontextmanager
+    async def slot(
+        self, priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncIterator[float]:
+        """Waits for capacity to make a request.
+
+        Args:
+            priority: The priority class of the request.
+
+        Yields:
+            The number of seconds spent waiting for capacity.
+
+        Raises:
+            QueueFullError: The queue for the priority class is full.
+        """
+        start = time.perf_counter()
+        await self._acquire(priority)
+        try:
+            yield time.perf_counter() - start
+        finally:
+            self._release(priority)
+
+    def try_acquire(self, priority: Priority = Priority.INTERACTIVE) -> bool:
+        """Takes a slot only if one is available now, without queueing.
+
+        A slot taken this way must be given back with :meth:`release`.
+
+        Args:
+            priority: The priority class of the request.
+
+        Returns:
+            Whether a slot was taken.
+        """
+        more_urgent_waiting = any(self._waiters[p] for p in Priority if p <= priority)
+        if not more_urgent_waiting and self._can_run(priority):
+            self._active[priority] += 1
+            return True
+        return False
+
+    def release(self, priority: Priority = Priority.INTERACTIVE) -> None:
+        """Gives back a slot taken with :meth:`try_acquire`.
+
+        Args:
+            priority: The priority class the slot was taken for.
+        """
+        self._release(priority)
+
+    async def _acquire(self, priority: Priority) -> None:
+        """Takes a slot, waiting in the queue if none is available."""
+        if self.try_acquire(priority):
+            return
+
+        waiters = self._waiters[priority]
+        if len(waiters) >= self.max_queue.get(priority, math.inf):
+            raise exceptions.QueueFullError(priority.name)
+
+        future = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted just as the waiter was cancelled.
+                self._release(priority)
+            elif future in waiters:
+                waiters.remove(future)
+            raise
+
+    def _release(self, priority: Priority) -> None:
+        """Returns a slot and admits waiting requests."""
+        self._active[priority] -= 1
+        for p in Priority:
+            waiters = self._waiters[p]
+            while waiters and self._can_run(p):
+                future = waiters.popleft()
+                if not future.done():
+                    self._active[p] += 1
+                    future.set_result(None)
+
+    def _can_run(self, priority: Priority) -> bool:
+        """Checks whether a request of the given class may start now."""
+        return (
+            self.active < self.max_concurrency
+            and self._active[priority] < self.limits[priority]
+        )
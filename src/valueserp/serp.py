@@ -2,10 +2,26 @@
 
 from __future__ import annotations
 
-from collections.abc import Mapping
+import functools
+import json
+from collections.abc import Iterable, Mapping
 
 from valueserp.models import FeaturedSnippet, OrganicLink, PAAItem, SERPInfo
 
+# The fields of the compact raw response whose values repeat across many
+# SERPs, by section.
+_INTERNED_FIELDS = {
+    "search_parameters": ("q", "location"),
+    "search_information": ("query_displayed",),
+}
+
+# The fields of the raw response used by WebSERP.info, by section.
+_INFO_FIELDS = {
+    "search_metadata": ("engine_url",),
+    "search_parameters": ("q", "location"),
+    "search_information": ("query_displayed", "total_results"),
+}
+
 
 class BaseSERP:
     """The default base SERP from which more specific types are inherited.
@@ -20,7 +36,13 @@ class BaseSERP:
 
 
 class WebSERP(BaseSERP):
-    """Represents a standard web search results page."""
+    """Represents a standard web search results page.
+
+    SERP features are extracted from the raw data the first time they are
+    accessed and cached on the object, so they are included when it is pickled.
+    """
+
+    _FEATURES = ("links", "featured_snippet", "related_searches", "people_also_ask")
 
     def info(self) -> SERPInfo:
         """Information about the SERP."""
@@ -36,7 +58,21 @@ class WebSERP(BaseSERP):
             total_results=search_info.get("total_results"),
         )
 
-    @property
+    def extract_features(self) -> None:
+        """Extracts all SERP features, caching them on the object."""
+        for feature in self._FEATURES:
+            getattr(self, feature)
+
+    def compact(self) -> None:
+        """Drops the raw data that is not needed once features are extracted.
+
+        All features are extracted first, then ``raw`` is cut down to the
+        fields used by :meth:`info`, so the SERP is small to pickle and to keep.
+        """
+        self.extract_features()
+        self.raw = _compact_raw(self.raw)
+
+    @functools.cached_property
     def links(self) -> list[OrganicLink]:
         """A list of the organic search results."""
         raw_links = self.raw.get("organic_results", [])
@@ -57,7 +93,7 @@ class WebSERP(BaseSERP):
 
         return links
 
-    @property
+    @functools.cached_property
     def featured_snippet(self) -> FeaturedSnippet | None:
         """The featured snippet, if shown."""
         raw_snippet = self.raw.get("answer_box")
@@ -72,7 +108,7 @@ class WebSERP(BaseSERP):
             source_url=featured_answer_source.get("link"),
         )
 
-    @property
+    @functools.cached_property
     def related_searches(self) -> list[str] | None:
         """A list of related search terms."""
         raw_rel_searches = self.raw.get("related_searches", [])
@@ -84,7 +120,7 @@ class WebSERP(BaseSERP):
         )
         return list(related_searches)
 
-    @property
+    @functools.cached_property
     def people_also_ask(self) -> list[PAAItem] | None:
         """A list of items from the "People also ask" feature."""
         raw_paa = self.raw.get("related_questions", [])
@@ -103,3 +139,106 @@ class WebSERP(BaseSERP):
             )
 
         return paa_items
+
+
+def parse_web_serp(body: str | bytes, compact: bool = False) -> WebSERP:
+    """Parses a web search response body into a SERP.
+
+    This is a module-level function so it can be run in a thread or process
+    pool, such as the ``parse_executor`` of
+    :class:`~valueserp.AsyncGoogleClient`. The returned object has all of its
+    features extracted already.
+
+    Args:
+        body: The JSON response body from the search API.
+        compact: Whether to cut the ``raw`` data down with
+            :meth:`WebSERP.compact`.
+
+    Returns:
+        A :class:`WebSERP` with its features extracted.
+    """
+    serp = WebSERP(json.loads(body))
+    if compact:
+        serp.compact()
+    else:
+        serp.extract_features()
+    return serp
+
+
+def _compact_raw(raw: Mapping) -> dict:
+    """Gets the fields of a raw response used by WebSERP.info."""
+    return {
+        section: {
+            field: raw[section][field] for field in fields if field in raw[section]
+        }
+        for section, fields in _INFO_FIELDS.items()
+        if isinstance(raw.get(section), dict)
+    }
+
+
+class StringTable:
+    """Shares a single copy of each distinct string.
+
+    Unlike :func:`sys.intern`, the strings are released once the table and
+    the objects using them are garbage collected.
+    """
+
+    def __init__(self) -> None:
+        """Initializes the StringTable."""
+        self._strings: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        """Returns the number of distinct strings in the table."""
+        return len(self._strings)
+
+    def __call__(self, value: str) -> str:
+        """Gets the shared copy of a string, adding it if it is new."""
+        return self._strings.setdefault(value, value)
+
+
+def parse_batch(
+    bodies: Iterable[str | bytes], strings: StringTable | None = None
+) -> list[WebSERP]:
+    """Parses many web search response bodies into compact SERPs.
+
+    Each SERP is compacted as by ``parse_web_serp(body, compact=True)``, so
+    only its features and the ``raw`` data needed by :meth:`WebSERP.info` are
+    kept. Bulk runs also repeat the same displayed URLs, locations, queries
+    and related searches across thousands of SERPs, and each response is
+    decoded separately, so each would otherwise hold its own copy of them.
+    Here they are replaced with a single copy from a shared
+    :class:`StringTable`.
+
+    Args:
+        bodies: The JSON response bodies from the search API.
+        strings: The table of shared strings. Pass the same table to several
+            calls to share strings between batches.
+
+    Returns:
+        A compact :class:`WebSERP` for each body, in order, with its features
+        extracted.
+    """
+    if strings is None:
+        strings = StringTable()
+
+    serps = []
+    for body in bodies:
+        serp = parse_web_serp(body, compact=True)
+        _share_strings(serp, strings)
+        serps.append(serp)
+    return serps
+
+
+def _share_strings(serp: WebSERP, strings: StringTable) -> None:
+    """Replaces repeated strings in a compact SERP with shared copies."""
+    for section, fields in _INTERNED_FIELDS.items():
+        obj = serp.raw.get(section, {})
+        for field in fields:
+            value = obj.get(field)
+            if isinstance(value, str):
+                obj[field] = strings(value)
+    for link in serp.links:
+        if link.url_displayed is not None:
+            link.url_displayed = strings(link.url_displayed)
+    if serp.related_searches:
+        serp.related_searches = [strings(query) for query in serp.related_searches]
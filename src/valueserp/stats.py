@@ -0,0 +1,46 @@
+"""Provides statistics about requests made to the API."""
+
+from __future__ import annotations
+
+__all__ = ["ResponseStats"]
+
+import dataclasses
+
+
+@dataclasses.dataclass(frozen=True)
+class ResponseStats:
+    """Transfer statistics for a single successful API response.
+
+    Pass a callable as the ``on_response`` keyword argument of a client to
+    receive one of these after every response.
+
+    Attributes:
+        method: The HTTP method of the request.
+        path: The API path that was requested.
+        status_code: The HTTP status code of the response.
+        content_encoding: The ``Content-Encoding`` of the response, if any.
+        compressed_bytes: The number of body bytes received over the network.
+        decompressed_bytes: The number of body bytes after decompression.
+        elapsed: The number of seconds from sending the request to reading
+            the whole body.
+        decode_time: The number of seconds spent decompressing the body.
+        queue_time: The number of seconds the request waited for capacity
+            before being sent. This is not included in ``elapsed``.
+    """
+
+    method: str
+    path: str
+    status_code: int
+    content_encoding: str | None
+    compressed_bytes: int
+    decompressed_bytes: int
+    elapsed: float
+    decode_time: float
+    queue_time: float = 0.0
+
+    @property
+    def compression_ratio(self) -> float:
+        """The ratio of decompressed to compressed size."""
+        if not self.compressed_bytes:
+            return 1.0
+        return self.decompressed_bytes / self.compressed_bytes
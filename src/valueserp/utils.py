@@ -2,30 +2,318 @@
 
 from __future__ import annotations
 
-from typing import NoReturn
+import datetime
+import email.utils
+import enum
+import hashlib
+import json
+import time
+from collections.abc import Callable, Mapping
+from typing import TYPE_CHECKING, Any, NoReturn
 
-import httpx
+from valueserp import compression, exceptions
+from valueserp.models import Location
 
-from valueserp import exceptions
+if TYPE_CHECKING:
+    import httpx
 
+# Error bodies larger than this are not parsed for a message.
+_MAX_ERROR_BODY_SIZE = 64 * 1024
 
-def parse_response_error(exception: httpx.HTTPStatusError) -> NoReturn:
+# Parameters whose values are codes or keywords that the API treats
+# case-insensitively. Free text such as the query is never lowercased, as
+# search operators like OR are case-sensitive.
+_CASE_INSENSITIVE_PARAMS = frozenset(
+    {
+        "cr",
+        "device",
+        "engine",
+        "gl",
+        "google_domain",
+        "hl",
+        "include_html",
+        "lr",
+        "output",
+        "safe",
+        "search_type",
+        "sort_by",
+        "time_period",
+    }
+)
+
+
+def parse_response_error(
+    exception: httpx.HTTPStatusError, content: bytes | None = None
+) -> NoReturn:
     """Parses a response and raises a relevant exception.
 
+    The response body is only decoded if it is a reasonably small JSON
+    document, so HTML or empty bodies from gateways never cause a decoding
+    error of their own.
+
     Args:
         exception: The HTTP exception to parse.
+        content: The body of a streamed response, as read by an
+            :func:`error_body_reader`. Defaults to the body of the response,
+            which must then have been read.
 
     Raises:
         InvalidCredentialsError: The API responded with a 401 status code.
+        QuotaExhaustedError: The API responded with a 402 status code.
+        RateLimitError: The API responded with a 429 status code.
+        ServerError: The API responded with a 5xx status code.
         ResponseError: The API responded with another status code and error message.
     """
-    status_code = exception.response.status_code
+    response = exception.response
+    status_code = response.status_code
     if status_code == 401:
         raise exceptions.InvalidCredentialsError() from exception
-    raw_json = exception.response.json()
-    message = raw_json.get("request_info", {}).get(
-        "message", "No additional information."
+
+    message = _error_message(response, content)
+    if status_code == 402:
+        error = exceptions.QuotaExhaustedError(status_code, message)
+    elif status_code == 429:
+        error = exceptions.RateLimitError(
+            status_code, message, retry_after=parse_retry_after(response.headers)
+        )
+    elif status_code >= 500:
+        error = exceptions.ServerError(status_code, message)
+    else:
+        error = exceptions.ResponseError(status_code, message)
+    raise error from exception
+
+
+def parse_retry_after(headers: httpx.Headers) -> float | None:
+    """Parses a ``Retry-After`` header.
+
+    Args:
+        headers: The response headers.
+
+    Returns:
+        The number of seconds to wait, or None if the header is missing or
+        invalid.
+    """
+    value = headers.get("retry-after", "").strip()
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max((retry_at - now).total_seconds(), 0.0)
+
+
+def error_body_reader(response: httpx.Response) -> BodyReader:
+    """Creates a reader for the body of a streamed error response.
+
+    Only bodies small enough to be parsed for an error message are read. The
+    reader's limit is checked against the ``Content-Length`` header and as
+    the body is read, so large error pages from gateways are abandoned
+    without being downloaded in full.
+
+    Args:
+        response: The error response.
+
+    Returns:
+        A :class:`BodyReader` limited to the largest error body parsed.
+    """
+    return BodyReader(_MAX_ERROR_BODY_SIZE, response.headers.get("content-encoding"))
+
+
+def _error_message(response: httpx.Response, content: bytes | None) -> str:
+    """Extracts the error message from an error response, if there is one."""
+    default = response.reason_phrase or "No additional information."
+    if content is None:
+        content = response.content
+    if not content or len(content) > _MAX_ERROR_BODY_SIZE:
+        return default
+    try:
+        raw_json = json.loads(content)
+    except ValueError:
+        return default
+    if not isinstance(raw_json, dict):
+        return default
+    request_info = raw_json.get("request_info")
+    if not isinstance(request_info, dict):
+        return default
+    return str(request_info.get("message") or default)
+
+
+def canonicalize_params(params: Mapping[str, Any]) -> dict[str, Any]:
+    """Normalizes request parameters so equivalent requests compare equal.
+
+    Parameters set to None are dropped, names are lowercased, whitespace in
+    values is collapsed, values of code-like parameters such as ``gl`` and
+    ``hl`` are lowercased, and the parameters are sorted by name. Booleans are
+    converted to the strings the API expects, numbers to strings as they are
+    sent in the query string, and locations and enums to their API values.
+
+    Args:
+        params: The request parameters.
+
+    Returns:
+        The canonical request parameters.
+    """
+    canonical = {}
+    for name, value in params.items():
+        if value is None:
+            continue
+        name = str(name).strip().lower()
+        if isinstance(value, (list, tuple)):
+            value = [_canonicalize_value(name, v) for v in value if v is not None]
+        else:
+            value = _canonicalize_value(name, value)
+        canonical[name] = value
+
+    return dict(sorted(canonical.items()))
+
+
+def request_key(params: Mapping[str, Any]) -> str:
+    """Builds a stable key identifying a request.
+
+    Requests whose parameters are equivalent after
+    :func:`canonicalize_params` share the same key, so it can be used for
+    caching and deduplicating requests.
+
+    Args:
+        params: The request parameters.
+
+    Returns:
+        A hex digest identifying the request.
+    """
+    encoded = json.dumps(
+        canonicalize_params(params), separators=(",", ":"), ensure_ascii=False
     )
-    raise exceptions.ResponseError(
-        status_code=status_code, response_message=message
-    ) from exception
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def normalize_site(site: str) -> str:
+    """Normalizes a domain for use in a ``site:`` search.
+
+    Args:
+        site: The domain or URL to search within.
+
+    Returns:
+        The domain and path, without scheme or trailing slash. The domain is
+        lowercased, but the path is kept as it is, as paths are case-sensitive.
+    """
+    site = site.strip()
+    for prefix in ("https://", "http://"):
+        if site.lower().startswith(prefix):
+            site = site[len(prefix) :]
+    host, slash, path = site.partition("/")
+    return (host.lower() + slash + path).rstrip("/")
+
+
+def _canonicalize_value(name: str, value: Any) -> Any:  # noqa: ANN401
+    """Normalizes a single parameter value."""
+    if isinstance(value, Location):
+        value = value.full_name
+    elif isinstance(value, enum.Enum):
+        value = value.value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        # Sent as the same query string as the equivalent string, e.g. "10".
+        return str(value)
+    if isinstance(value, str):
+        value = " ".join(value.split())
+        if name in _CASE_INSENSITIVE_PARAMS:
+            value = value.lower()
+    return value
+
+
+class BodyReader:
+    """Accumulates and decompresses a streamed response body.
+
+    The size limit applies to the decompressed body. It is checked against the
+    ``Content-Length`` header before any of the body is read, and is passed to
+    the decompressor as each chunk is decompressed, so an oversized response
+    is abandoned without being buffered or decompressed in full.
+
+    Args:
+        max_size: The maximum body size in bytes, or None for no limit.
+        content_encoding: The ``Content-Encoding`` of the response, if any.
+
+    Attributes:
+        max_size: The maximum body size in bytes, or None for no limit.
+        compressed_size: The number of raw bytes received so far.
+        size: The number of decompressed bytes received so far.
+        decode_time: The number of seconds spent decompressing so far.
+    """
+
+    def __init__(
+        self, max_size: int | None = None, content_encoding: str | None = None
+    ) -> None:
+        """Initializes the BodyReader."""
+        self.max_size = max_size
+        self.compressed_size = 0
+        self.size = 0
+        self.decode_time = 0.0
+        self._decompressor = compression.get_decompressor(content_encoding)
+        self._chunks: list[bytes] = []
+        self._flushed = False
+
+    def check_headers(self, headers: httpx.Headers) -> None:
+        """Checks the declared length of a response against the size limit.
+
+        Args:
+            headers: The headers of the response.
+
+        Raises:
+            ResponseTooLargeError: The declared length exceeds the limit.
+        """
+        content_length = headers.get("content-length", "")
+        if (
+            self.max_size is not None
+            and content_length.isdigit()
+            and int(content_length) > self.max_size
+        ):
+            raise exceptions.ResponseTooLargeError(self.max_size)
+
+    def feed(self, chunk: bytes) -> None:
+        """Adds a raw chunk of the body.
+
+        Args:
+            chunk: The next chunk of the response body, as received.
+
+        Raises:
+            ResponseTooLargeError: The body has grown beyond the limit.
+        """
+        self.compressed_size += len(chunk)
+        remaining = -1 if self.max_size is None else max(self.max_size - self.size, 0)
+        self._append(self._decode(self._decompressor.decompress, chunk, remaining))
+
+    def getvalue(self) -> bytes:
+        """Returns the complete decompressed body."""
+        if not self._flushed:
+            self._flushed = True
+            self._append(self._decode(self._decompressor.flush))
+        body = b"".join(self._chunks)
+        self._chunks = [body]
+        return body
+
+    def _decode(self, func: Callable[..., bytes], *args: bytes | int) -> bytes:
+        """Calls a decompressor method, timing how long it takes."""
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        except Exception as e:
+            raise exceptions.DecodingError() from e
+        finally:
+            self.decode_time += time.perf_counter() - start
+
+    def _append(self, data: bytes) -> None:
+        """Adds decompressed data to the body, enforcing the size limit."""
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            raise exceptions.ResponseTooLargeError(self.max_size)
+        if data:
+            self._chunks.append(data)
@@ -1,5 +1,9 @@
 """Tests for the async client."""
 
+import asyncio
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
 import httpx
@@ -8,9 +12,14 @@ import respx
 
 from valueserp import const, exceptions
 from valueserp.aclient import AsyncGoogleClient
+from valueserp.circuitbreaker import CircuitBreaker, CircuitState
 from valueserp.const import DEFAULT_RETRIES, DEFAULT_TIMEOUT
 from valueserp.credentials import Credentials
-from valueserp.serp import WebSERP
+from valueserp.hedging import HedgePolicy
+from valueserp.locations import LocationIndex
+from valueserp.models import Location
+from valueserp.scheduler import Priority, PriorityScheduler
+from valueserp.serp import WebSERP, parse_web_serp
 
 
 @pytest.fixture(scope="module")
@@ -108,7 +117,10 @@ class TestAsyncGoogleClient:
             mock_request.return_value = '{"result": "success"}'
             result = await client.search({"q": "test"})
             mock_request.assert_called_once_with(
-                const.API_PATH["search"], params={"q": "test"}
+                const.API_PATH["search"],
+                params={"q": "test"},
+                priority=Priority.INTERACTIVE,
+                timeout=None,
             )
             assert result == {"result": "success"}
 
@@ -118,7 +130,11 @@ class TestAsyncGoogleClient:
         with mock.patch("valueserp.AsyncGoogleClient.search") as mock_search:
             mock_search.return_value = {"result": "success"}
             result = await client.web_search("test")
-            mock_search.assert_called_once_with(params={"q": "test", "location": None})
+            mock_search.assert_called_once_with(
+                params={"q": "test", "location": None},
+                priority=Priority.INTERACTIVE,
+                timeout=None,
+            )
             assert isinstance(result, WebSERP)
             assert result.raw == {"result": "success"}
 
@@ -130,6 +146,326 @@ class TestAsyncGoogleClient:
             result = await client.web_search("test", site="example.com")
             mock_search.assert_called_once_with(
                 params={"q": "site:example.com test", "location": None},
+                priority=Priority.INTERACTIVE,
+                timeout=None,
             )
             assert isinstance(result, WebSERP)
             assert result.raw == {"result": "success"}
+
+    @pytest.mark.asyncio
+    async def test_web_search_location_object(self, client: AsyncGoogleClient):
+        """Tests the `web_search` method with a Location object."""
+        location = Location(id=1, name="London", type="city", full_name="London,UK")
+        with mock.patch("valueserp.AsyncGoogleClient.search") as mock_search:
+            mock_search.return_value = {"result": "success"}
+            await client.web_search("test", location=location)
+            mock_search.assert_called_once_with(
+                params={"q": "test", "location": "London,UK"},
+                priority=Priority.INTERACTIVE,
+                timeout=None,
+            )
+
+    @pytest.mark.asyncio
+    async def test_locations_uses_index(self, client: AsyncGoogleClient):
+        """Tests that the `locations` method caches results in the index."""
+        client.location_index = LocationIndex()
+        with mock.patch("valueserp.AsyncGoogleClient._request") as mock_request:
+            mock_request.return_value = (
+                '{"locations": [{"id": 1, "name": "London", "type": "city", '
+                '"full_name": "London,UK"}]}'
+            )
+            first = await client.locations("london", type="city")
+            second = await client.locations("London", type="city")
+            mock_request.assert_called_once_with(
+                const.API_PATH["locations"], params={"q": "london", "type": "city"}
+            )
+        assert first == second
+        assert first[0].full_name == "London,UK"
+
+    @pytest.mark.asyncio
+    async def test_resolve_location_from_index(self, client: AsyncGoogleClient):
+        """Tests that `resolve_location` avoids a request for indexed locations."""
+        location = Location(id=1, name="London", type="city", full_name="London,UK")
+        client.location_index = LocationIndex()
+        client.location_index.put("london", [location])
+        with mock.patch("valueserp.AsyncGoogleClient._request") as mock_request:
+            assert await client.resolve_location("london") == location
+            mock_request.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_request_response_too_large(self, creds: Credentials):
+        """Tests that the `_request` method enforces `max_response_size`."""
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            test_route = router.route(path=const.API_PATH["account"]).respond(
+                json={"result": "x" * 100}
+            )
+            async with AsyncGoogleClient(creds, max_response_size=50) as client:
+                with pytest.raises(exceptions.ResponseTooLargeError):
+                    await client._request(const.API_PATH["account"])
+                client.max_response_size = None
+                response = await client._request(const.API_PATH["account"])
+        assert test_route.call_count == 2
+        assert json.loads(response) == {"result": "x" * 100}
+
+    @pytest.mark.asyncio
+    async def test_request_reports_stats(self, creds: Credentials):
+        """Tests that the `_request` method reports transfer statistics."""
+        content = b'{"result": "success"}' * 10
+        compressed = gzip.compress(content)
+        on_response = mock.Mock()
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            router.route(path=const.API_PATH["account"]).respond(
+                content=compressed, headers={"Content-Encoding": "gzip"}
+            )
+            async with AsyncGoogleClient(creds, on_response=on_response) as client:
+                assert "gzip" in client._session.headers["Accept-Encoding"]
+                response = await client._request(const.API_PATH["account"])
+        assert response == content.decode()
+        stats = on_response.call_args.args[0]
+        assert stats.path == const.API_PATH["account"]
+        assert stats.status_code == 200
+        assert stats.content_encoding == "gzip"
+        assert stats.compressed_bytes == len(compressed)
+        assert stats.decompressed_bytes == len(content)
+        assert stats.compression_ratio > 1
+
+    @pytest.mark.asyncio
+    async def test_search_canonicalizes_params(self, client: AsyncGoogleClient):
+        """Tests that the `search` method normalizes parameters."""
+        with mock.patch("valueserp.AsyncGoogleClient._request") as mock_request:
+            mock_request.return_value = '{"result": "success"}'
+            await client.search({"q": " test  query ", "location": None, "GL": "US"})
+            mock_request.assert_called_once_with(
+                const.API_PATH["search"],
+                params={"gl": "us", "q": "test query"},
+                priority=Priority.INTERACTIVE,
+                timeout=None,
+            )
+
+    @pytest.mark.asyncio
+    async def test_request_uses_scheduler(self, creds: Credentials):
+        """Tests that the `_request` method waits for scheduler capacity."""
+        scheduler = PriorityScheduler(max_concurrency=1)
+        on_response = mock.Mock()
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            router.route(path=const.API_PATH["account"]).respond(json={})
+            async with AsyncGoogleClient(
+                creds, scheduler=scheduler, on_response=on_response
+            ) as client:
+                async with scheduler.slot(Priority.INTERACTIVE):
+                    request = asyncio.create_task(
+                        client._request(
+                            const.API_PATH["account"], priority=Priority.BULK
+                        )
+                    )
+                    await asyncio.sleep(0.05)
+                    assert scheduler.queued(Priority.BULK) == 1
+                await request
+        assert scheduler.active == 0
+        assert on_response.call_args.args[0].queue_time >= 0.04
+
+    @pytest.mark.asyncio
+    async def test_web_search_parse_executor(self, creds: Credentials):
+        """Tests that `web_search` parses responses in the `parse_executor`."""
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            client = AsyncGoogleClient(creds, parse_executor=executor)
+            with mock.patch("valueserp.AsyncGoogleClient._request") as mock_request:
+                mock_request.return_value = '{"organic_results": [{"position": 1}]}'
+                with mock.patch(
+                    "valueserp.aclient.parse_web_serp", wraps=parse_web_serp
+                ) as mock_parse:
+                    result = await client.web_search("test")
+                    search = await client.search({"q": "test"})
+            await client.close()
+        mock_parse.assert_called_once()
+        assert isinstance(result, WebSERP)
+        assert "links" in vars(result)
+        assert result.links[0].position == 1
+        assert search == {"organic_results": [{"position": 1}]}
+        assert result.raw == search
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("use_executor", [False, True])
+    async def test_web_search_compact_serps(self, creds: Credentials, use_executor):
+        """Tests that `compact_serps` applies with or without an executor."""
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            client = AsyncGoogleClient(
+                creds,
+                parse_executor=executor if use_executor else None,
+                compact_serps=True,
+            )
+            with mock.patch("valueserp.AsyncGoogleClient._request") as mock_request:
+                mock_request.return_value = json.dumps(
+                    {
+                        "search_parameters": {"q": "test"},
+                        "organic_results": [{"position": 1}],
+                    }
+                )
+                result = await client.web_search("test")
+            await client.close()
+        assert result.raw == {"search_parameters": {"q": "test"}}
+        assert result.links[0].position == 1
+
+    @pytest.mark.asyncio
+    async def test_request_timeout(self, creds: Credentials):
+        """Tests that `_request` abandons requests after `timeout` seconds."""
+
+        async def slow_response(request):
+            await asyncio.sleep(1)
+            return httpx.Response(200, json={})
+
+        with respx.mock(base_url=const.ENDPOINT, assert_all_called=False) as router:
+            router.route(path=const.API_PATH["account"]).mock(side_effect=slow_response)
+            async with AsyncGoogleClient(creds) as client:
+                with pytest.raises(exceptions.RequestTimeoutError) as exc_info:
+                    await client._request(const.API_PATH["account"], timeout=0.05)
+        assert exc_info.value.timeout == 0.05
+
+    @pytest.mark.asyncio
+    async def test_request_hedged(self, creds: Credentials):
+        """Tests that slow requests are hedged and the fastest response wins."""
+        calls = 0
+
+        async def first_slow(request):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(1)
+                return httpx.Response(200, json={"attempt": 1})
+            return httpx.Response(200, json={"attempt": 2})
+
+        hedge = HedgePolicy(delay=0.05)
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            router.route(path=const.API_PATH["account"]).mock(side_effect=first_slow)
+            async with AsyncGoogleClient(creds, hedge=hedge) as client:
+                response = await asyncio.wait_for(
+                    client._request(const.API_PATH["account"]), 0.5
+                )
+        assert json.loads(response) == {"attempt": 2}
+        assert hedge.hedges == 1
+        assert len(hedge.latencies) == 1
+
+    @pytest.mark.asyncio
+    async def test_request_not_hedged_when_fast(self, creds: Credentials):
+        """Tests that requests faster than the threshold are not hedged."""
+        hedge = HedgePolicy(delay=1)
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            route = router.route(path=const.API_PATH["account"]).respond(json={})
+            async with AsyncGoogleClient(creds, hedge=hedge) as client:
+                await client._request(const.API_PATH["account"])
+        assert route.call_count == 1
+        assert hedge.hedges == 0
+
+    @pytest.mark.asyncio
+    async def test_request_circuit_breaker(self, creds: Credentials):
+        """Tests that the `_request` method fails fast while the circuit is open."""
+        breaker = CircuitBreaker(min_calls=2)
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            route = router.route(path=const.API_PATH["account"]).respond(
+                status_code=503, text="<html>Service Unavailable</html>"
+            )
+            async with AsyncGoogleClient(creds, circuit_breaker=breaker) as client:
+                for _ in range(2):
+                    with pytest.raises(exceptions.ServerError):
+                        await client._request(const.API_PATH["account"])
+                with pytest.raises(exceptions.CircuitOpenError):
+                    await client._request(const.API_PATH["account"])
+        assert route.call_count == 2
+        assert breaker.state is CircuitState.OPEN
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_counts_deadlines(self, creds: Credentials):
+        """Tests that requests cut off by `timeout` can open the circuit."""
+        breaker = CircuitBreaker(slow_call_duration=0.01, min_calls=2)
+
+        async def hang(request):
+            await asyncio.sleep(1)
+            return httpx.Response(200, json={})
+
+        with respx.mock(base_url=const.ENDPOINT, assert_all_called=False) as router:
+            router.route(path=const.API_PATH["account"]).mock(side_effect=hang)
+            async with AsyncGoogleClient(creds, circuit_breaker=breaker) as client:
+                for _ in range(2):
+                    with pytest.raises(exceptions.RequestTimeoutError):
+                        await client._request(const.API_PATH["account"], timeout=0.05)
+                with pytest.raises(exceptions.CircuitOpenError):
+                    await client._request(const.API_PATH["account"], timeout=0.05)
+        assert breaker.state is CircuitState.OPEN
+
+    @pytest.mark.asyncio
+    async def test_aenter_warms_connections(self, creds: Credentials):
+        """Tests that entering the client opens `warmup` connections."""
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            route = router.route(path="/").mock(side_effect=httpx.ConnectError)
+            async with AsyncGoogleClient(creds, warmup=3) as client:
+                assert await client.warm(2) == 0
+        assert route.call_count == 5
+        assert "api_key" not in route.calls.last.request.url.params
+
+    @pytest.mark.asyncio
+    async def test_keepalive(self, creds: Credentials):
+        """Tests that pooled connections are refreshed in the background."""
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            route = router.route(path="/").respond()
+            async with AsyncGoogleClient(creds, keepalive_interval=0.01) as client:
+                await asyncio.sleep(0.1)
+            assert client._keepalive_task is None
+        assert route.call_count >= 1
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_ignores_queue_time(self, creds: Credentials):
+        """Tests that time queued by the scheduler does not count as slow."""
+        breaker = CircuitBreaker(
+            slow_call_duration=0.05, slow_call_rate=0.5, min_calls=4
+        )
+
+        async def respond(request):
+            await asyncio.sleep(0.03)
+            return httpx.Response(200, json={})
+
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            router.route(path=const.API_PATH["account"]).mock(side_effect=respond)
+            async with AsyncGoogleClient(
+                creds,
+                circuit_breaker=breaker,
+                scheduler=PriorityScheduler(max_concurrency=1),
+            ) as client:
+                await asyncio.gather(
+                    *(client._request(const.API_PATH["account"]) for _ in range(4))
+                )
+        assert breaker.state is CircuitState.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_hedge_respects_scheduler(self, creds: Credentials):
+        """Tests that hedged requests take scheduler slots and are skipped at capacity."""
+        active = []
+
+        async def slow(request):
+            active.append(scheduler.active)
+            await asyncio.sleep(0.1)
+            return httpx.Response(200, json={})
+
+        scheduler = PriorityScheduler(
+            max_concurrency=2, shares={Priority.INTERACTIVE: 0.5}
+        )
+        hedge = HedgePolicy(delay=0.01)
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            router.route(path=const.API_PATH["account"]).mock(side_effect=slow)
+            async with AsyncGoogleClient(
+                creds, hedge=hedge, scheduler=scheduler
+            ) as client:
+                await client._request(const.API_PATH["account"])
+                assert (len(active), hedge.hedges) == (1, 0)
+
+                scheduler.limits[Priority.INTERACTIVE] = 2
+                await client._request(const.API_PATH["account"])
+        assert hedge.hedges == 1
+        assert active == [1, 1, 2]
+        assert scheduler.active == 0
+
+    @pytest.mark.asyncio
+    async def test_warm_after_close(self, creds: Credentials):
+        """Tests that warming a closed client opens no connections."""
+        client = AsyncGoogleClient(creds)
+        await client.close()
+        assert await client.warm(2) == 0
@@ -0,0 +1,133 @@
+"""Tests for the circuit breaker."""
+
+import time
+
+import pytest
+import respx
+
+from valueserp import const, exceptions
+from valueserp.circuitbreaker import CircuitBreaker, CircuitState
+from valueserp.client import GoogleClient
+from valueserp.credentials import Credentials
+from valueserp.middleware import RetryMiddleware
+
+
+def _fail(breaker, error=None):
+    """Records a failed call."""
+    with pytest.raises(exceptions.APIError):
+        with breaker.call():
+            raise error or exceptions.ServerError(503, "Unavailable")
+
+
+def _succeed(breaker):
+    """Records a successful call."""
+    with breaker.call():
+        pass
+
+
+def test_opens_on_failure_rate():
+    """Tests that the circuit opens once the failure rate is reached."""
+    changes = []
+    breaker = CircuitBreaker(
+        failure_rate=0.5,
+        min_calls=4,
+        on_state_change=lambda old, new: changes.append((old, new)),
+    )
+    _succeed(breaker)
+    _fail(breaker)
+    _succeed(breaker)
+    assert breaker.state is CircuitState.CLOSED
+    _fail(breaker)
+    assert breaker.state is CircuitState.OPEN
+    assert changes == [(CircuitState.CLOSED, CircuitState.OPEN)]
+
+    with pytest.raises(exceptions.CircuitOpenError) as exc_info:
+        _succeed(breaker)
+    assert 0 < exc_info.value.retry_after <= breaker.reset_timeout
+
+
+def test_client_errors_do_not_open():
+    """Tests that non-retryable errors count as successes."""
+    breaker = CircuitBreaker(min_calls=2)
+    for _ in range(5):
+        _fail(breaker, exceptions.ResponseError(400, "Bad request"))
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_opens_on_slow_calls():
+    """Tests that the circuit opens when too many calls are slow."""
+    breaker = CircuitBreaker(slow_call_duration=0.01, slow_call_rate=0.5, min_calls=2)
+    for _ in range(2):
+        with breaker.call():
+            time.sleep(0.02)
+    assert breaker.state is CircuitState.OPEN
+
+
+def test_half_open_probe_closes():
+    """Tests that a successful probe closes the circuit."""
+    changes = []
+    breaker = CircuitBreaker(
+        min_calls=1,
+        reset_timeout=0.01,
+        on_state_change=lambda old, new: changes.append(new),
+    )
+    _fail(breaker)
+    time.sleep(0.02)
+    with breaker.call():
+        assert breaker.state is CircuitState.HALF_OPEN
+        # Only one probe is allowed at a time.
+        with pytest.raises(exceptions.CircuitOpenError):
+            _succeed(breaker)
+    assert breaker.state is CircuitState.CLOSED
+    assert changes == [CircuitState.OPEN, CircuitState.HALF_OPEN, CircuitState.CLOSED]
+
+
+def test_half_open_probe_failure_reopens():
+    """Tests that a failed probe opens the circuit again."""
+    breaker = CircuitBreaker(min_calls=1, reset_timeout=0.01)
+    _fail(breaker)
+    time.sleep(0.02)
+    _fail(breaker)
+    assert breaker.state is CircuitState.OPEN
+
+
+def test_abandoned_probe_is_released():
+    """Tests that a cancelled probe frees its slot."""
+    breaker = CircuitBreaker(min_calls=1, reset_timeout=0.01)
+    _fail(breaker)
+    time.sleep(0.02)
+    with pytest.raises(KeyboardInterrupt):
+        with breaker.call():
+            raise KeyboardInterrupt
+    _succeed(breaker)
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_slow_abandoned_calls_count_as_slow():
+    """Tests that calls abandoned after `slow_call_duration` count as slow."""
+    breaker = CircuitBreaker(slow_call_duration=0.01, min_calls=2)
+    for _ in range(2):
+        with pytest.raises(KeyboardInterrupt):
+            with breaker.call():
+                time.sleep(0.02)
+                raise KeyboardInterrupt
+    assert breaker.state is CircuitState.OPEN
+
+
+def test_open_circuit_is_not_retried():
+    """Tests that retry middleware fails fast while the circuit is open."""
+    breaker = CircuitBreaker(min_calls=1, reset_timeout=3)
+    retry = RetryMiddleware(backoff=0.01)
+    with respx.mock(base_url=const.ENDPOINT) as router:
+        route = router.route(path=const.API_PATH["account"]).respond(
+            status_code=503, text="Service Unavailable"
+        )
+        with GoogleClient(
+            Credentials("TESTKEY"), circuit_breaker=breaker, middleware=[retry]
+        ) as client:
+            start = time.monotonic()
+            for _ in range(2):
+                with pytest.raises(exceptions.CircuitOpenError):
+                    client._request(const.API_PATH["account"])
+            assert time.monotonic() - start < 1
+    assert route.call_count == 1
@@ -0,0 +1,143 @@
+"""Tests for the command-line interface."""
+
+import csv
+import io
+import json
+from unittest import mock
+
+import pytest
+
+from valueserp import cli, exceptions
+from valueserp.middleware import RateLimitMiddleware
+from valueserp.serp import WebSERP
+
+
+def _serp(query, location=None, site=None, priority=None, **kwargs):
+    """Builds a fake SERP echoing the search parameters."""
+    return WebSERP(
+        {
+            "search_parameters": {"q": query, "location": location, **kwargs},
+            "organic_results": [{"position": 1, "link": f"https://{query}.com/"}],
+        }
+    )
+
+
+@pytest.fixture
+def web_search():
+    """Patches `AsyncGoogleClient.web_search` with a fake."""
+    with mock.patch(
+        "valueserp.AsyncGoogleClient.web_search", side_effect=_serp
+    ) as web_search:
+        yield web_search
+
+
+def test_read_jobs_txt():
+    """Tests reading queries from a text file."""
+    file = io.StringIO("seo\n\n  ppc \nseo\n")
+    jobs = list(cli.read_jobs(file, "txt", {"gl": "us"}))
+    assert [job.params for job in jobs] == [
+        {"gl": "us", "q": "seo"},
+        {"gl": "us", "q": "ppc"},
+        {"gl": "us", "q": "seo"},
+    ]
+    assert jobs[0].key == jobs[2].key
+
+
+def test_read_jobs_csv():
+    """Tests reading queries and parameters from a CSV file."""
+    file = io.StringIO("Query,location,gl\nseo,London,\nppc,,uk\n")
+    jobs = list(cli.read_jobs(file, "csv", {"gl": "us"}))
+    assert [job.params for job in jobs] == [
+        {"gl": "us", "location": "London", "q": "seo"},
+        {"gl": "uk", "q": "ppc"},
+    ]
+
+
+def test_main_ndjson(tmp_path, web_search):
+    """Tests running searches and writing NDJSON output."""
+    queries = tmp_path / "queries.txt"
+    queries.write_text("seo\nppc\nseo\n")
+    output = tmp_path / "results.ndjson"
+
+    status = cli.main(
+        [str(queries), "-o", str(output), "--api-key", "KEY", "-l", "London", "-q"]
+    )
+
+    assert status == 0
+    assert web_search.call_count == 2
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(r["params"]["q"] for r in records) == ["ppc", "seo"]
+    assert records[0]["response"]["search_parameters"]["location"] == "London"
+    checkpoint = (tmp_path / "results.ndjson.checkpoint").read_text().split()
+    assert sorted(checkpoint) == sorted(r["key"] for r in records)
+
+
+def test_main_resumes_from_checkpoint(tmp_path, web_search, capsys):
+    """Tests that completed searches are skipped when resuming."""
+    queries = tmp_path / "queries.csv"
+    queries.write_text("query\nseo\nppc\n")
+    output = tmp_path / "results.csv"
+    args = [str(queries), "-o", str(output), "--api-key", "KEY", "-q"]
+
+    web_search.side_effect = [_serp("seo"), exceptions.RequestError()]
+    assert cli.main(args) == 1
+    assert "'ppc' failed: RequestError" in capsys.readouterr().err
+
+    web_search.side_effect = _serp
+    web_search.reset_mock()
+    assert cli.main(args) == 0
+    web_search.assert_called_once()
+    assert web_search.call_args.args == ("ppc",)
+
+    rows = list(csv.DictReader(output.open()))
+    # Failed searches are not written, so each search has one result.
+    assert [(row["query"], row["url"]) for row in rows] == [
+        ("seo", "https://seo.com/"),
+        ("ppc", "https://ppc.com/"),
+    ]
+
+
+def test_main_requires_api_key(monkeypatch, tmp_path):
+    """Tests that an API key is required."""
+    monkeypatch.delenv(cli.API_KEY_ENV, raising=False)
+    with pytest.raises(SystemExit):
+        cli.main([str(tmp_path / "queries.txt")])
+
+
+def test_read_jobs_drops_reserved_columns():
+    """Tests that columns clashing with client arguments are dropped."""
+    file = io.StringIO("query,priority,timeout,gl\nseo,1,5,uk\n")
+    jobs = list(cli.read_jobs(file, "csv", {"timeout": "1"}))
+    assert jobs[0].params == {"gl": "uk", "q": "seo"}
+
+
+def test_main_reports_unexpected_errors(tmp_path, web_search, capsys):
+    """Tests that an unexpected error fails only its own search."""
+    queries = tmp_path / "queries.txt"
+    queries.write_text("seo\nppc\n")
+    output = tmp_path / "results.ndjson"
+
+    web_search.side_effect = [TypeError("bad row"), _serp("ppc")]
+    status = cli.main(
+        [str(queries), "-o", str(output), "--api-key", "KEY", "-c", "1", "-q"]
+    )
+
+    assert status == 1
+    assert "'seo' failed: TypeError: bad row" in capsys.readouterr().err
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [record["params"]["q"] for record in records] == ["ppc"]
+
+
+def test_main_rate_limits_with_middleware(tmp_path, web_search):
+    """Tests that --rate adds rate limiting middleware to the client."""
+    queries = tmp_path / "queries.txt"
+    queries.write_text("seo\n")
+    args = [str(queries), "-o", str(tmp_path / "out.ndjson"), "--api-key", "KEY"]
+
+    with mock.patch.object(
+        cli, "AsyncGoogleClient", wraps=cli.AsyncGoogleClient
+    ) as client_cls:
+        assert cli.main([*args, "-q", "--rate", "5"]) == 0
+    (middleware,) = client_cls.call_args.kwargs["middleware"]
+    assert isinstance(middleware, RateLimitMiddleware)
+    assert middleware.rate == 5
@@ -1,5 +1,8 @@
 """Tests for the sync client."""
 
+import gzip
+import json
+import time
 from unittest import mock
 
 import httpx
@@ -7,9 +10,12 @@ import pytest
 import respx
 
 from valueserp import AsyncGoogleClient, const, exceptions
+from valueserp.circuitbreaker import CircuitBreaker, CircuitState
 from valueserp.client import GoogleClient
 from valueserp.const import DEFAULT_RETRIES, DEFAULT_TIMEOUT
 from valueserp.credentials import Credentials
+from valueserp.locations import LocationIndex
+from valueserp.models import Location
 from valueserp.serp import WebSERP
 
 
@@ -113,6 +119,19 @@ class TestGoogleClient:
             assert isinstance(result, WebSERP)
             assert result.raw == {"result": "success"}
 
+    def test_web_search_compact_serps(self, creds: Credentials):
+        """Tests that `web_search` compacts SERPs if `compact_serps` is set."""
+        client = GoogleClient(creds, compact_serps=True)
+        with mock.patch("valueserp.GoogleClient.search") as mock_search:
+            mock_search.return_value = {
+                "search_parameters": {"q": "test"},
+                "organic_results": [{"position": 1}],
+            }
+            result = client.web_search("test")
+        client.close()
+        assert result.raw == {"search_parameters": {"q": "test"}}
+        assert result.links[0].position == 1
+
     def test_site_web_search_success(self, client: GoogleClient):
         """Tests the `web_search` method with a site parameter."""
         with mock.patch("valueserp.GoogleClient.search") as mock_search:
@@ -123,3 +142,188 @@ class TestGoogleClient:
             )
             assert isinstance(result, WebSERP)
             assert result.raw == {"result": "success"}
+
+    def test_web_search_location_object(self, client: GoogleClient):
+        """Tests the `web_search` method with a Location object."""
+        location = Location(id=1, name="London", type="city", full_name="London,UK")
+        with mock.patch("valueserp.GoogleClient.search") as mock_search:
+            mock_search.return_value = {"result": "success"}
+            client.web_search("test", location=location)
+            mock_search.assert_called_once_with(
+                params={"q": "test", "location": "London,UK"},
+            )
+
+    def test_locations_uses_index(self, client: GoogleClient):
+        """Tests that the `locations` method caches results in the index."""
+        client.location_index = LocationIndex()
+        with mock.patch("valueserp.GoogleClient._request") as mock_request:
+            mock_request.return_value = (
+                '{"locations": [{"id": 1, "name": "London", "type": "city", '
+                '"full_name": "London,UK"}]}'
+            )
+            first = client.locations("london", type="city")
+            second = client.locations("London", type="city")
+            mock_request.assert_called_once_with(
+                const.API_PATH["locations"], params={"q": "london", "type": "city"}
+            )
+        assert first == second
+        assert first[0].full_name == "London,UK"
+
+    def test_resolve_location_from_index(self, client: GoogleClient):
+        """Tests that `resolve_location` avoids a request for indexed locations."""
+        location = Location(id=1, name="London", type="city", full_name="London,UK")
+        client.location_index = LocationIndex()
+        client.location_index.put("london", [location])
+        with mock.patch("valueserp.GoogleClient._request") as mock_request:
+            assert client.resolve_location("london") == location
+            mock_request.assert_not_called()
+
+    def test_resolve_location_refreshes_stale(self, client: GoogleClient):
+        """Tests that `resolve_location` refetches stale indexed locations."""
+        location = Location(id=1, name="London", type="city", full_name="London,UK")
+        client.location_index = LocationIndex(ttl=0)
+        client.location_index.put("london", [location])
+        with mock.patch("valueserp.GoogleClient._request") as mock_request:
+            mock_request.return_value = json.dumps(
+                {"locations": [{"id": 1, "name": "London", "full_name": "London,UK"}]}
+            )
+            assert client.resolve_location("london").id == 1
+            mock_request.assert_called_once()
+
+    def test_request_response_too_large(self, creds: Credentials):
+        """Tests that the `_request` method enforces `max_response_size`."""
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            test_route = router.route(path=const.API_PATH["account"]).respond(
+                json={"result": "x" * 100}
+            )
+            with GoogleClient(creds, max_response_size=50) as client:
+                with pytest.raises(exceptions.ResponseTooLargeError):
+                    client._request(const.API_PATH["account"])
+                client.max_response_size = None
+                response = client._request(const.API_PATH["account"])
+        assert test_route.call_count == 2
+        assert json.loads(response) == {"result": "x" * 100}
+
+    def test_request_large_error_body(self, creds: Credentials):
+        """Tests that large error bodies are abandoned without being read."""
+        chunks_sent = 0
+
+        def error_page():
+            nonlocal chunks_sent
+            for _ in range(1000):
+                chunks_sent += 1
+                yield b"<html>" + b"x" * 8192
+
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            router.route(path=const.API_PATH["account"]).mock(
+                side_effect=lambda request: httpx.Response(502, content=error_page())
+            )
+            with GoogleClient(creds) as client:
+                with pytest.raises(exceptions.ServerError) as exc_info:
+                    client._request(const.API_PATH["account"])
+        assert exc_info.value.response_message == "Bad Gateway"
+        assert chunks_sent < 10
+
+    def test_request_error_message(self, creds: Credentials):
+        """Tests that messages are parsed from small streamed error bodies."""
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            router.route(path=const.API_PATH["account"]).respond(
+                status_code=400, json={"request_info": {"message": "Bad q"}}
+            )
+            with GoogleClient(creds) as client:
+                with pytest.raises(exceptions.ResponseError) as exc_info:
+                    client._request(const.API_PATH["account"])
+        assert exc_info.value.response_message == "Bad q"
+
+    def test_request_reports_stats(self, creds: Credentials):
+        """Tests that the `_request` method reports transfer statistics."""
+        content = b'{"result": "success"}' * 10
+        compressed = gzip.compress(content)
+        on_response = mock.Mock()
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            router.route(path=const.API_PATH["account"]).respond(
+                content=compressed, headers={"Content-Encoding": "gzip"}
+            )
+            with GoogleClient(creds, on_response=on_response) as client:
+                assert "gzip" in client._session.headers["Accept-Encoding"]
+                response = client._request(const.API_PATH["account"])
+        assert response == content.decode()
+        stats = on_response.call_args.args[0]
+        assert stats.path == const.API_PATH["account"]
+        assert stats.status_code == 200
+        assert stats.content_encoding == "gzip"
+        assert stats.compressed_bytes == len(compressed)
+        assert stats.decompressed_bytes == len(content)
+        assert stats.compression_ratio > 1
+
+    def test_search_canonicalizes_params(self, client: GoogleClient):
+        """Tests that the `search` method normalizes parameters."""
+        with mock.patch("valueserp.GoogleClient._request") as mock_request:
+            mock_request.return_value = '{"result": "success"}'
+            client.search({"q": " test  query ", "location": None, "GL": "US"})
+            mock_request.assert_called_once_with(
+                const.API_PATH["search"], params={"gl": "us", "q": "test query"}
+            )
+
+    def test_request_timeout(self, creds: Credentials):
+        """Tests that the `_request` method raises a RequestTimeoutError."""
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            router.route(path=const.API_PATH["account"]).mock(
+                side_effect=httpx.ReadTimeout("Timed out")
+            )
+            with GoogleClient(creds) as client:
+                with pytest.raises(exceptions.RequestTimeoutError) as exc_info:
+                    client._request(const.API_PATH["account"])
+        assert exc_info.value.retryable
+
+    def test_request_circuit_breaker(self, creds: Credentials):
+        """Tests that the `_request` method fails fast while the circuit is open."""
+        breaker = CircuitBreaker(min_calls=2)
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            route = router.route(path=const.API_PATH["account"]).respond(
+                status_code=503, text="<html>Service Unavailable</html>"
+            )
+            with GoogleClient(creds, circuit_breaker=breaker) as client:
+                for _ in range(2):
+                    with pytest.raises(exceptions.ServerError):
+                        client._request(const.API_PATH["account"])
+                with pytest.raises(exceptions.CircuitOpenError):
+                    client._request(const.API_PATH["account"])
+        assert route.call_count == 2
+        assert breaker.state is CircuitState.OPEN
+
+    def test_enter_warms_connections(self, creds: Credentials):
+        """Tests that entering the client opens `warmup` connections."""
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            route = router.route(path="/").respond(status_code=404)
+            with GoogleClient(creds, warmup=3):
+                pass
+        assert route.call_count == 3
+        assert "api_key" not in route.calls.last.request.url.params
+
+    def test_keepalive(self, creds: Credentials):
+        """Tests that pooled connections are refreshed in the background."""
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            route = router.route(path="/").respond()
+            with GoogleClient(creds, keepalive_interval=0.01):
+                time.sleep(0.1)
+            calls = route.call_count
+            time.sleep(0.05)
+        assert calls >= 1
+        assert route.call_count == calls
+
+    def test_warm_after_close(self, creds: Credentials):
+        """Tests that warming a closed client opens no connections."""
+        client = GoogleClient(creds)
+        client.close()
+        assert client.warm(2) == 0
+
+    def test_close_waits_for_keepalive(self, creds: Credentials):
+        """Tests that closing the client stops its keepalive thread."""
+        with respx.mock(base_url=const.ENDPOINT) as router:
+            router.route(path="/").respond()
+            with GoogleClient(creds, keepalive_interval=0.01) as client:
+                thread = client._keepalive_thread
+                time.sleep(0.03)
+        assert not thread.is_alive()
+        assert client._keepalive_thread is None
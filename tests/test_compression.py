@@ -0,0 +1,97 @@
+"""Tests for content-encoding negotiation and decompression."""
+
+import gzip
+import types
+import zlib
+
+import pytest
+
+from valueserp import compression, exceptions, utils
+
+BODY = b'{"result": "success"}' * 100
+
+
+def test_accept_encoding_prefers_best():
+    """Tests that the best supported encoding is preferred."""
+    header = compression.accept_encoding()
+    encodings = compression.supported_encodings()
+    assert header.startswith(encodings[0])
+    assert "gzip" in header
+    assert header.split(", ")[-1].startswith("deflate;q=")
+
+
+@pytest.mark.parametrize(
+    "encoding, data",
+    [
+        ("gzip", gzip.compress(BODY)),
+        ("deflate", zlib.compress(BODY)),
+        ("deflate", zlib.compress(BODY, wbits=-zlib.MAX_WBITS)),
+        ("identity", BODY),
+        (None, BODY),
+    ],
+)
+def test_body_reader_decompresses(encoding, data):
+    """Tests that the `BodyReader` decompresses streamed chunks."""
+    body = utils.BodyReader(content_encoding=encoding)
+    for i in range(0, len(data), 16):
+        body.feed(data[i : i + 16])
+    assert body.getvalue() == BODY
+    assert body.compressed_size == len(data)
+    assert body.size == len(BODY)
+    assert body.decode_time >= 0
+
+
+def test_body_reader_limits_decompressed_size():
+    """Tests that the size limit applies after decompression."""
+    body = utils.BodyReader(max_size=len(BODY) - 1, content_encoding="gzip")
+    with pytest.raises(exceptions.ResponseTooLargeError):
+        body.feed(gzip.compress(BODY))
+
+
+def test_body_reader_bounds_decompression():
+    """Tests that a small chunk is not decompressed far beyond the limit."""
+    bomb = gzip.compress(bytes(50 * 2**20))
+    body = utils.BodyReader(max_size=1000, content_encoding="gzip")
+    with pytest.raises(exceptions.ResponseTooLargeError):
+        body.feed(bomb)
+    assert body.size == 1001
+
+
+class _ExpandingBrotli:
+    """Stands in for an old brotli decompressor that cannot limit its output."""
+
+    def process(self, data):
+        return bytes(1000 * len(data))
+
+
+class _ExpandingZstd:
+    """Stands in for a zstandard decompressor writing large blocks."""
+
+    def stream_writer(self, writer, write_size):
+        return types.SimpleNamespace(
+            write=lambda data: [writer.write(bytes(write_size)) for _ in data]
+        )
+
+
+def test_decompressors_without_limits_are_bounded(monkeypatch):
+    """Tests that Brotli and Zstandard output is bounded by `max_length`."""
+    monkeypatch.setattr(
+        compression, "brotli", types.SimpleNamespace(Decompressor=_ExpandingBrotli)
+    )
+    monkeypatch.setattr(
+        compression,
+        "zstandard",
+        types.SimpleNamespace(ZstdDecompressor=_ExpandingZstd),
+    )
+    data = bytes(4 * compression._SLICE_SIZE)
+    brotli_output = compression.BrotliDecompressor().decompress(data, 10)
+    assert len(brotli_output) == 1000 * compression._SLICE_SIZE
+    zstd_output = compression.ZstdDecompressor().decompress(data, 10)
+    assert len(zstd_output) == compression._ZSTD_WRITE_SIZE
+
+
+def test_body_reader_invalid_data():
+    """Tests that corrupt bodies raise a DecodingError."""
+    body = utils.BodyReader(content_encoding="gzip")
+    with pytest.raises(exceptions.DecodingError):
+        body.feed(b"not gzip")
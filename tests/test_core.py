@@ -0,0 +1,76 @@
+"""Tests for the I/O-free client core."""
+
+import pytest
+
+from valueserp import exceptions
+from valueserp.core import Request, Send, Sleep, adrive, drive
+
+REQUEST = Request("GET", "/search", {"q": "test"})
+
+
+def flow(request):
+    """A flow that sleeps, then sends, recovering from one failure."""
+    yield Sleep(0)
+    try:
+        body = yield Send(request)
+    except exceptions.RequestError:
+        body = yield Send(request)
+    return body.upper()
+
+
+def test_drive():
+    """Tests that `drive` performs I/O and returns the flow's result."""
+    sent = []
+
+    def send(request):
+        sent.append(request)
+        if len(sent) == 1:
+            raise exceptions.RequestError()
+        return "ok"
+
+    assert drive(flow(REQUEST), send) == "OK"
+    assert sent == [REQUEST, REQUEST]
+
+
+def test_drive_raises():
+    """Tests that errors not handled by the flow are raised."""
+
+    def send(request):
+        raise exceptions.RequestError()
+
+    with pytest.raises(exceptions.RequestError):
+        drive(flow(REQUEST), send)
+
+
+@pytest.mark.asyncio
+async def test_adrive():
+    """Tests that `adrive` behaves the same as `drive`."""
+    sent = []
+
+    async def send(request):
+        sent.append(request)
+        if len(sent) == 1:
+            raise exceptions.RequestError()
+        return "ok"
+
+    assert await adrive(flow(REQUEST), send) == "OK"
+    assert sent == [REQUEST, REQUEST]
+
+
+def test_drive_closes_flow_on_interrupt():
+    """Tests that the flow is closed when the driver is interrupted."""
+    closed = []
+
+    def guarded(request):
+        try:
+            return (yield Send(request))
+        except GeneratorExit:
+            closed.append(True)
+            raise
+
+    def send(request):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        drive(guarded(REQUEST), send)
+    assert closed == [True]
@@ -0,0 +1,87 @@
+"""Tests for SERP diffing."""
+
+import io
+import json
+
+from valueserp.diff import diff_runs, diff_serps, read_run, url_key
+from valueserp.serp import WebSERP
+
+
+def make_serp(urls, snippet=None, questions=(), related=()):
+    """Builds a SERP with the given features."""
+    raw = {
+        "organic_results": [
+            {"position": i, "link": url} for i, url in enumerate(urls, start=1)
+        ],
+        "related_questions": [{"question": q} for q in questions],
+        "related_searches": [{"query": r} for r in related],
+    }
+    if snippet:
+        raw["answer_box"] = {"answers": [{"source": {"link": snippet}}]}
+    return WebSERP(raw)
+
+
+def test_url_key_normalizes():
+    """Tests that trivially different URLs have the same identity."""
+    assert url_key("https://Example.com/page/") == url_key("https://example.com/page")
+    assert url_key("https://example.com/a#top") == url_key("https://example.com/a")
+    assert url_key("https://example.com/a?x=1") != url_key("https://example.com/a")
+
+
+def test_diff_serps_links():
+    """Tests that entered, exited and moved URLs are reported."""
+    old = make_serp(["https://a.com/", "https://b.com/", "https://c.com/"])
+    new = make_serp(["https://b.com", "https://a.com/", "https://d.com/"])
+    diff = diff_serps(old, new)
+    assert [(c.url, c.new_position) for c in diff.entered] == [("https://d.com/", 3)]
+    assert [(c.url, c.old_position) for c in diff.exited] == [("https://c.com/", 3)]
+    assert {c.url: c.delta for c in diff.moved} == {
+        "https://b.com": 1,
+        "https://a.com/": -1,
+    }
+    assert diff.unchanged == 0
+    assert diff.changed
+    assert diff.entered[0].delta is None
+    assert diff.exited[0].delta is None
+
+
+def test_diff_serps_features():
+    """Tests that changes to SERP features are reported."""
+    old = make_serp([], snippet="https://a.com/", questions=["Why?"], related=["x"])
+    new = make_serp([], snippet="https://b.com/", questions=["How?"], related=["x"])
+    diff = diff_serps(old, new)
+    assert diff.snippet_changed
+    assert (diff.old_snippet_url, diff.new_snippet_url) == (
+        "https://a.com/",
+        "https://b.com/",
+    )
+    assert diff.paa_added == ["How?"]
+    assert diff.paa_removed == ["Why?"]
+    assert diff.related_added == diff.related_removed == []
+
+
+def test_diff_serps_unchanged():
+    """Tests that identical SERPs have no changes."""
+    serp = make_serp(["https://a.com/"], snippet="https://a.com/", related=["x"])
+    diff = diff_serps(serp, serp)
+    assert not diff.changed
+    assert diff.unchanged == 1
+
+
+def test_diff_runs():
+    """Tests that runs are compared by search key."""
+    old = {"k1": make_serp(["https://a.com/"]), "k2": make_serp([])}
+    new = [("k3", make_serp([])), ("k1", make_serp(["https://b.com/"]))]
+    diffs = dict(diff_runs(old, new))
+    assert list(diffs) == ["k1"]
+    assert [c.url for c in diffs["k1"].entered] == ["https://b.com/"]
+
+
+def test_read_run():
+    """Tests that NDJSON runs are read, skipping failed searches."""
+    records = [
+        {"key": "k1", "params": {"q": "a"}, "response": {"organic_results": []}},
+        {"key": "k2", "params": {"q": "b"}, "error": "failed"},
+    ]
+    file = io.StringIO("".join(json.dumps(r) + "\n" for r in records))
+    assert [key for key, _ in read_run(file)] == ["k1"]
@@ -0,0 +1,25 @@
+"""Tests for hedged request policies."""
+
+from valueserp.hedging import HedgePolicy, LatencyTracker
+
+
+def test_latency_tracker_percentile():
+    """Tests computing percentiles over a rolling window."""
+    tracker = LatencyTracker(window=10)
+    assert tracker.percentile(95) is None
+    for latency in range(1, 21):
+        tracker.record(latency / 10)
+    assert len(tracker) == 10
+    assert tracker.percentile(50) == 1.5
+    assert tracker.percentile(95) == 2.0
+    assert tracker.percentile(0) == 1.1
+
+
+def test_hedge_policy_threshold():
+    """Tests that the threshold falls back to the delay until warmed up."""
+    policy = HedgePolicy(percentile=90, delay=0.5, min_samples=5)
+    assert policy.threshold() == 0.5
+    for latency in (0.1, 0.2, 0.3, 0.4, 1.0):
+        policy.latencies.record(latency)
+    assert policy.threshold() == 1.0
+    assert HedgePolicy().threshold() is None
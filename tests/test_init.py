@@ -0,0 +1,43 @@
+"""Tests for the top-level package."""
+
+import subprocess
+import sys
+
+import pytest
+
+import valueserp
+
+
+def _imported_modules(statement: str) -> set[str]:
+    """Lists the modules imported by a statement in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-c", f"{statement}; import sys; print(*sys.modules)"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return set(result.stdout.split())
+
+
+def test_import_is_lazy():
+    """Tests that importing the package doesn't import the HTTP stack."""
+    modules = _imported_modules("import valueserp; valueserp.Credentials('KEY')")
+    assert "httpx" not in modules
+    assert "valueserp.client" not in modules
+    assert "valueserp.aclient" not in modules
+
+
+def test_lazy_attributes():
+    """Tests that public objects are importable from the package."""
+    from valueserp.aclient import AsyncGoogleClient
+    from valueserp.models import Location
+
+    assert valueserp.AsyncGoogleClient is AsyncGoogleClient
+    assert valueserp.Location is Location
+    assert set(valueserp.__all__) <= set(dir(valueserp))
+
+
+def test_unknown_attribute():
+    """Tests that unknown attributes raise AttributeError."""
+    with pytest.raises(AttributeError):
+        valueserp.NotAThing  # noqa: B018
@@ -0,0 +1,147 @@
+"""Tests for the local location index."""
+
+import time
+
+import pytest
+
+from valueserp.locations import (
+    LocationIndex,
+    normalize_location_name,
+    parse_locations,
+)
+from valueserp.models import Location
+
+LONDON = Location(
+    id=1,
+    name="London",
+    type="city",
+    full_name="London,England,United Kingdom",
+    country_code="GB",
+    reach=9000000,
+    gps=(51.5, -0.12),
+)
+LONDON_ON = Location(
+    id=2,
+    name="London",
+    type="city",
+    full_name="London,Ontario,Canada",
+    country_code="CA",
+    reach=400000,
+)
+UK = Location(
+    id=3,
+    name="United Kingdom",
+    type="country",
+    full_name="United Kingdom",
+    country_code="GB",
+    reach=67000000,
+)
+
+
+@pytest.fixture
+def index():
+    """Reusable location index populated with a few locations."""
+    index = LocationIndex()
+    index.put("london", [LONDON, LONDON_ON])
+    index.put("united kingdom", [UK], type="country")
+    yield index
+    index.close()
+
+
+def test_normalize_location_name():
+    """Tests that casing and whitespace are ignored."""
+    assert (
+        normalize_location_name("  London , England,United   Kingdom ")
+        == "london,england,united kingdom"
+    )
+
+
+def test_parse_locations():
+    """Tests parsing a locations API response."""
+    response = {
+        "locations": [
+            {
+                "id": 1,
+                "name": "London",
+                "type": "city",
+                "full_name": "London,England,United Kingdom",
+                "country_code": "GB",
+                "reach": 9000000,
+                "gps": [51.5, -0.12],
+            }
+        ]
+    }
+    assert parse_locations(response) == [LONDON]
+
+
+def test_parse_locations_skips_unnamed():
+    """Tests that locations without an ID or names are skipped."""
+    response = {
+        "locations": [
+            {"id": 2, "name": None, "full_name": "Nowhere"},
+            {"id": 3, "name": "Nowhere"},
+            {"name": "Nowhere", "full_name": "Nowhere"},
+        ]
+    }
+    assert parse_locations(response) == []
+
+
+def test_get_cached_query(index: LocationIndex):
+    """Tests that cached queries are returned in their original order."""
+    assert index.get(" London ") == [LONDON, LONDON_ON]
+    assert index.get("united kingdom", type="country") == [UK]
+    assert index.get("united kingdom") is None
+
+
+def test_get_stale_query(index: LocationIndex):
+    """Tests that stale queries are not returned."""
+    index.ttl = 0
+    time.sleep(0.01)
+    assert index.get("london") is None
+
+
+def test_lookup_full_name(index: LocationIndex):
+    """Tests resolving a full location name."""
+    assert index.lookup("london, ontario, canada") == [LONDON_ON]
+
+
+def test_lookup_name_prefers_reach(index: LocationIndex):
+    """Tests that ambiguous names resolve to the location with most reach."""
+    assert index.lookup("LONDON") == [LONDON]
+    assert index.lookup("london", limit=2) == [LONDON, LONDON_ON]
+
+
+def test_lookup_prefix(index: LocationIndex):
+    """Tests resolving a location by prefix."""
+    assert index.lookup("united") == [UK]
+
+
+def test_lookup_fuzzy(index: LocationIndex):
+    """Tests resolving a misspelt location."""
+    assert index.lookup("Lundon") == [LONDON]
+
+
+def test_lookup_no_match(index: LocationIndex):
+    """Tests that unknown locations resolve to nothing."""
+    assert index.lookup("Paris") == []
+    assert index.lookup("  ") == []
+
+
+def test_persistence(tmp_path):
+    """Tests that the index persists between instances."""
+    path = tmp_path / "locations.db"
+    index = LocationIndex(path)
+    index.put("london", [LONDON])
+    index.close()
+
+    index = LocationIndex(path)
+    assert index.lookup("london") == [LONDON]
+    index.close()
+
+
+def test_lookup_ignores_stale(index: LocationIndex):
+    """Tests that stale locations are not resolved."""
+    index.ttl = 0
+    time.sleep(0.01)
+    assert index.lookup("london") == []
+    assert index.lookup("Lundon") == []
@@ -0,0 +1,131 @@
+"""Tests for the request middleware."""
+
+import time
+from unittest import mock
+
+import httpx
+import pytest
+import respx
+
+from valueserp import const, exceptions
+from valueserp.aclient import AsyncGoogleClient
+from valueserp.client import GoogleClient
+from valueserp.core import Request, Send, drive
+from valueserp.credentials import Credentials
+from valueserp.middleware import (
+    CacheMiddleware,
+    MetricsMiddleware,
+    RateLimitMiddleware,
+    RetryMiddleware,
+)
+
+REQUEST = Request("GET", "/search", {"q": "test"})
+
+
+def run(middleware, responses, request=REQUEST):
+    """Runs a request through middleware, recording any sleeps."""
+    sleeps = []
+    sent = []
+
+    def call_next(request):
+        return (yield Send(request))
+
+    def send(request):
+        sent.append(request)
+        response = responses[len(sent) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    flow = middleware.handle(request, call_next)
+    with mock.patch("time.sleep", side_effect=sleeps.append):
+        result = drive(flow, send)
+    return result, sleeps, sent
+
+
+def test_retry_backoff():
+    """Tests that retryable errors are retried with exponential backoff."""
+    error = exceptions.ServerError(503, "Unavailable")
+    result, sleeps, sent = run(RetryMiddleware(backoff=1), [error, error, "ok"])
+    assert result == "ok"
+    assert sleeps == [1, 2]
+    assert len(sent) == 3
+
+
+def test_retry_honours_retry_after():
+    """Tests that the delay requested by the API is respected."""
+    error = exceptions.RateLimitError(429, "Too many requests", retry_after=5)
+    _, sleeps, _ = run(RetryMiddleware(backoff=1), [error, "ok"])
+    assert sleeps == [5]
+
+
+def test_retry_gives_up():
+    """Tests that non-retryable errors and exhausted retries are raised."""
+    with pytest.raises(exceptions.ResponseError):
+        run(RetryMiddleware(), [exceptions.ResponseError(400, "Bad request")])
+    error = exceptions.ServerError(500, "Error")
+    with pytest.raises(exceptions.ServerError):
+        run(RetryMiddleware(attempts=1, backoff=0), [error, error])
+    with pytest.raises(exceptions.ServerError):
+        run(RetryMiddleware(), [error], Request("POST", "/search"))
+
+
+def test_rate_limit():
+    """Tests that requests beyond the burst are spaced out."""
+    limiter = RateLimitMiddleware(rate=10, burst=2)
+    sleeps = [run(limiter, ["ok"])[1] for _ in range(4)]
+    assert sleeps[:2] == [[], []]
+    assert sleeps[2][0] == pytest.approx(0.1, abs=0.01)
+    assert sleeps[3][0] == pytest.approx(0.2, abs=0.01)
+
+
+def test_cache():
+    """Tests that GET responses are cached by canonical parameters."""
+    cache = CacheMiddleware(max_entries=1)
+    assert run(cache, ["first"])[0] == "first"
+    same = Request("GET", "/search", {"Q": " test "})
+    assert run(cache, ["second"], same) == ("first", [], [])
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    run(cache, ["other"], Request("GET", "/search", {"q": "other"}))
+    assert run(cache, ["third"])[0] == "third"
+    assert run(cache, ["fourth"], Request("POST", "/search"))[0] == "fourth"
+
+
+def test_cache_expires():
+    """Tests that cached responses expire after the TTL."""
+    cache = CacheMiddleware(ttl=0.01)
+    run(cache, ["first"])
+    time.sleep(0.02)
+    assert run(cache, ["second"])[0] == "second"
+
+
+def test_metrics():
+    """Tests that requests, errors and latency are recorded."""
+    metrics = MetricsMiddleware()
+    assert metrics.mean_latency is None
+    run(metrics, ["ok"])
+    with pytest.raises(exceptions.RequestError):
+        run(metrics, [exceptions.RequestError()])
+    assert metrics.requests == 2
+    assert metrics.errors == {"RequestError": 1}
+    assert metrics.mean_latency >= 0
+
+
+@pytest.mark.asyncio
+async def test_clients_share_pipeline():
+    """Tests that both clients run requests through the same middleware."""
+    creds = Credentials("TESTKEY")
+    middleware = [CacheMiddleware(), RetryMiddleware(backoff=0)]
+    with respx.mock(base_url=const.ENDPOINT) as router:
+        route = router.route(path=const.API_PATH["search"])
+        route.side_effect = [
+            httpx.Response(503, text="Unavailable"),
+            httpx.Response(200, json={"result": 1}),
+        ]
+        with GoogleClient(creds, middleware=middleware) as client:
+            assert client.search({"q": "test"}) == {"result": 1}
+        async with AsyncGoogleClient(creds, middleware=middleware) as client:
+            assert await client.search({"q": "test"}) == {"result": 1}
+    assert route.call_count == 2
+    assert middleware[0].hits == 1
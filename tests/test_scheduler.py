@@ -0,0 +1,93 @@
+"""Tests for the priority scheduler."""
+
+import asyncio
+
+import pytest
+
+from valueserp import exceptions
+from valueserp.scheduler import Priority, PriorityScheduler
+
+
+def test_init_limits():
+    """Tests that class limits are derived from shares."""
+    scheduler = PriorityScheduler(max_concurrency=10)
+    assert scheduler.limits == {Priority.INTERACTIVE: 10, Priority.BULK: 8}
+    scheduler = PriorityScheduler(max_concurrency=2, shares={Priority.BULK: 0.1})
+    assert scheduler.limits[Priority.BULK] == 1
+
+
+@pytest.mark.asyncio
+async def test_interactive_jumps_queue():
+    """Tests that waiting interactive requests are admitted before bulk ones."""
+    scheduler = PriorityScheduler(max_concurrency=1)
+    release = asyncio.Event()
+    order = []
+
+    async def request(name, priority):
+        async with scheduler.slot(priority):
+            order.append(name)
+            await release.wait()
+
+    first = asyncio.create_task(request("bulk-1", Priority.BULK))
+    await asyncio.sleep(0)
+    waiting = [
+        asyncio.create_task(request("bulk-2", Priority.BULK)),
+        asyncio.create_task(request("interactive", Priority.INTERACTIVE)),
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.queued() == 2
+    release.set()
+    await asyncio.gather(first, *waiting)
+    assert order == ["bulk-1", "interactive", "bulk-2"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_share_reserves_capacity():
+    """Tests that bulk requests cannot use the whole capacity."""
+    scheduler = PriorityScheduler(max_concurrency=2, shares={Priority.BULK: 0.5})
+    async with scheduler.slot(Priority.BULK):
+        bulk = asyncio.create_task(scheduler.slot(Priority.BULK).__aenter__())
+        await asyncio.sleep(0)
+        assert not bulk.done()
+        async with scheduler.slot(Priority.INTERACTIVE) as queue_time:
+            assert queue_time < 0.1
+            assert scheduler.active == 2
+        bulk.cancel()
+    assert scheduler.active == 0
+    assert scheduler.queued() == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_full():
+    """Tests that requests are rejected when their queue is full."""
+    scheduler = PriorityScheduler(max_concurrency=1, max_queue={Priority.BULK: 0})
+    async with scheduler.slot(Priority.INTERACTIVE):
+        with pytest.raises(exceptions.QueueFullError):
+            async with scheduler.slot(Priority.BULK):
+                pass
+
+
+@pytest.mark.asyncio
+async def test_queue_time_reported():
+    """Tests that the time spent waiting for capacity is reported."""
+    scheduler = PriorityScheduler(max_concurrency=1)
+
+    async def hold():
+        async with scheduler.slot():
+            await asyncio.sleep(0.05)
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    async with scheduler.slot() as queue_time:
+        assert queue_time >= 0.04
+    await holder
+
+
+@pytest.mark.asyncio
+async def test_try_acquire():
+    """Tests that slots can be taken without queueing."""
+    scheduler = PriorityScheduler(max_concurrency=1)
+    assert scheduler.try_acquire(Priority.BULK)
+    assert not scheduler.try_acquire(Priority.INTERACTIVE)
+    scheduler.release(Priority.BULK)
+    assert scheduler.active == 0
@@ -0,0 +1,93 @@
+"""Tests for the SERP objects."""
+
+import json
+import pickle
+
+from valueserp.models import OrganicLink
+from valueserp.serp import StringTable, WebSERP, parse_batch, parse_web_serp
+
+RAW = {
+    "search_parameters": {"q": "test", "location": "United Kingdom"},
+    "organic_results": [
+        {"position": 1, "title": "Example", "link": "https://example.com/"},
+    ],
+    "related_searches": [{"query": "test query"}],
+}
+
+
+def test_parse_web_serp_extracts_features():
+    """Tests that `parse_web_serp` extracts features eagerly."""
+    serp = parse_web_serp(json.dumps(RAW))
+    assert serp.raw == RAW
+    for feature in ("links", "featured_snippet", "related_searches"):
+        assert feature in vars(serp)
+
+
+def test_web_serp_compact():
+    """Tests that `compact` keeps the features and the info but no more."""
+    serp = WebSERP(json.loads(json.dumps(RAW)))
+    serp.compact()
+    assert serp.raw == {"search_parameters": RAW["search_parameters"]}
+    assert serp.info().query == "test"
+    assert serp.links[0].url == "https://example.com/"
+    assert serp.related_searches == ["test query"]
+
+
+def test_web_serp_pickles_features():
+    """Tests that extracted features survive pickling."""
+    serp = pickle.loads(pickle.dumps(parse_web_serp(json.dumps(RAW))))
+    assert vars(serp)["links"] == [
+        OrganicLink(
+            position=1,
+            block_position=None,
+            title="Example",
+            url="https://example.com/",
+            url_displayed=None,
+            description=None,
+            date=None,
+        )
+    ]
+    assert serp.related_searches == ["test query"]
+    assert serp.people_also_ask is None
+
+
+def test_parse_web_serp_pickles_compactly():
+    """Tests that parsed SERPs pickle without the bulk of the raw response."""
+    raw = {**RAW, "inline_html": "x" * 100_000}
+    body = json.dumps(raw)
+    assert len(pickle.dumps(parse_web_serp(body, compact=True))) < 2000
+    assert len(pickle.dumps(parse_web_serp(body))) > len(body)
+
+
+def test_parse_batch_shares_strings():
+    """Tests that `parse_batch` compacts SERPs and shares repeated strings."""
+    bodies = [
+        json.dumps(
+            {
+                "search_parameters": {"q": f"query {i}", "location": "United Kingdom"},
+                "organic_results": [
+                    {
+                        "position": 1,
+                        "link": f"https://example.com/{i}",
+                        "domain": "example.com",
+                        "displayed_link": "https://example.com",
+                        "snippet": "A description.",
+                    }
+                ],
+                "related_searches": [{"query": "test query"}],
+            }
+        )
+        for i in range(2)
+    ]
+    strings = StringTable()
+    first, second = parse_batch(bodies, strings)
+    assert first.raw == {
+        "search_parameters": {"q": "query 0", "location": "United Kingdom"}
+    }
+    assert first.links[0].url_displayed is second.links[0].url_displayed
+    assert first.related_searches[0] is second.related_searches[0]
+    assert first.info().location is second.info().location
+    assert first.links[0].url == "https://example.com/0"
+    assert first.links[0].description == "A description."
+    # "query 0", "query 1", "United Kingdom", "https://example.com", "test query"
+    assert len(strings) == 5
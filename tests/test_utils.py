@@ -4,6 +4,8 @@ import httpx
 import pytest
 
 from valueserp import exceptions, utils
+from valueserp.models import Location
+from valueserp.searchtype import SearchType
 
 
 def test_parse_response_error_401():
@@ -31,3 +33,141 @@ def test_parse_response_error_other_status():
         utils.parse_response_error(exception)
     assert exc_info.value.status_code == 429
     assert exc_info.value.response_message == message
+
+
+def test_body_reader():
+    """Tests that the `BodyReader` accumulates chunks."""
+    body = utils.BodyReader(max_size=6)
+    body.check_headers(httpx.Headers({"content-length": "6"}))
+    body.feed(b"abc")
+    body.feed(b"def")
+    assert body.getvalue() == b"abcdef"
+    assert body.size == 6
+
+
+def test_body_reader_too_large():
+    """Tests that the `BodyReader` enforces its size limit."""
+    body = utils.BodyReader(max_size=4)
+    with pytest.raises(exceptions.ResponseTooLargeError):
+        body.check_headers(httpx.Headers({"content-length": "5"}))
+    body.feed(b"abc")
+    with pytest.raises(exceptions.ResponseTooLargeError):
+        body.feed(b"de")
+
+
+def test_canonicalize_params():
+    """Tests that equivalent parameters are normalized identically."""
+    location = Location(id=1, name="London", type="city", full_name="London,UK")
+    params = {
+        "q": "  best   SEO  tools ",
+        "location": location,
+        "GL": "UK",
+        "include_answer_box": True,
+        "search_type": SearchType.NEWS,
+        "page": 2,
+        "device": None,
+    }
+    canonical = utils.canonicalize_params(params)
+    assert canonical == {
+        "gl": "uk",
+        "include_answer_box": "true",
+        "location": "London,UK",
+        "page": "2",
+        "q": "best SEO tools",
+        "search_type": "news",
+    }
+    assert list(canonical) == sorted(canonical)
+
+
+def test_request_key():
+    """Tests that request keys are stable for equivalent requests."""
+    key = utils.request_key({"q": "seo", "gl": "US", "location": None})
+    assert key == utils.request_key({"gl": "us", "q": " seo "})
+    assert key != utils.request_key({"q": "SEO", "gl": "us"})
+    assert utils.request_key({"q": "a", "num": 10}) == utils.request_key(
+        {"q": "a", "num": "10"}
+    )
+
+
+def test_normalize_site():
+    """Tests normalizing domains for site: searches."""
+    assert utils.normalize_site(" HTTPS://Example.com/blog/ ") == "example.com/blog"
+    assert utils.normalize_site("Example.com/Blog") == "example.com/Blog"
+
+
+def _status_error(status_code, **kwargs):
+    """Builds an HTTPStatusError for a response."""
+    return httpx.HTTPStatusError(
+        "Error",
+        request=httpx.Request(method="GET", url="https://example.com/"),
+        response=httpx.Response(status_code=status_code, **kwargs),
+    )
+
+
+@pytest.mark.parametrize(
+    "status_code, error_type, retryable",
+    [
+        (400, exceptions.ResponseError, False),
+        (402, exceptions.QuotaExhaustedError, False),
+        (429, exceptions.RateLimitError, True),
+        (500, exceptions.ServerError, True),
+        (503, exceptions.ServerError, True),
+    ],
+)
+def test_parse_response_error_types(status_code, error_type, retryable):
+    """Tests that status codes map to typed exceptions."""
+    with pytest.raises(error_type) as exc_info:
+        utils.parse_response_error(
+            _status_error(status_code, json={"request_info": {"message": "Oops"}})
+        )
+    assert type(exc_info.value) is error_type
+    assert exc_info.value.response_message == "Oops"
+    assert exc_info.value.retryable is retryable
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"content": b""},
+        {"content": b"<html>Bad Gateway</html>"},
+        {"json": ["not", "an", "object"]},
+        {"json": {"request_info": None}},
+    ],
+)
+def test_parse_response_error_unparseable_body(kwargs):
+    """Tests that unexpected error bodies fall back to the reason phrase."""
+    with pytest.raises(exceptions.ServerError) as exc_info:
+        utils.parse_response_error(_status_error(502, **kwargs))
+    assert exc_info.value.response_message == "Bad Gateway"
+
+
+def test_error_body_reader_checks_length():
+    """Tests that error bodies declared too large are rejected unread."""
+    response = httpx.Response(502, content=b"x" * 100_000)
+    with pytest.raises(exceptions.ResponseTooLargeError):
+        utils.error_body_reader(response).check_headers(response.headers)
+
+
+def test_parse_response_error_content():
+    """Tests that messages are parsed from the given content."""
+    with pytest.raises(exceptions.ServerError) as exc_info:
+        utils.parse_response_error(
+            _status_error(503), b'{"request_info": {"message": "Down"}}'
+        )
+    assert exc_info.value.response_message == "Down"
+
+
+def test_parse_response_error_retry_after():
+    """Tests that rate limit errors include the Retry-After delay."""
+    with pytest.raises(exceptions.RateLimitError) as exc_info:
+        utils.parse_response_error(_status_error(429, headers={"Retry-After": "30"}))
+    assert exc_info.value.retry_after == 30
+
+
+def test_parse_retry_after():
+    """Tests parsing Retry-After headers."""
+    assert utils.parse_retry_after(httpx.Headers()) is None
+    assert utils.parse_retry_after(httpx.Headers({"Retry-After": "1.5"})) == 1.5
+    assert utils.parse_retry_after(httpx.Headers({"Retry-After": "soon"})) is None
+    past = "Wed, 21 Oct 2015 07:28:00 GMT"
+    assert utils.parse_retry_after(httpx.Headers({"Retry-After": past})) == 0